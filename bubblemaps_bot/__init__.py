@@ -16,6 +16,8 @@ telegram_config = base_config["telegram"]
 database_config = base_config["database"]
 valkey_config = base_config["valkey"]
 bubblemaps_config = base_config["bubblemaps"]
+http_config = base_config.get("http", {})
+browser_config = base_config.get("browser", {})
 
 BOT_TOKEN: Final[str] = telegram_config["bot_token"]
 DROP_UPDATES: Final[bool] = telegram_config.get("drop_updates", True)
@@ -40,16 +42,71 @@ VALKEY_HOST = valkey_config.get("host", "localhost")
 VALKEY_PORT = valkey_config.get("port", 6379)
 VALKEY_DB = valkey_config.get("db", 0)
 VALKEY_TTL = valkey_config.get("ttl", 600)
+VALKEY_KEY_PREFIX = valkey_config.get("key_prefix", "bubblemaps")
+NEGATIVE_CACHE_TTL = valkey_config.get("negative_ttl", 60)
+MAP_DATA_MAX_AGE = valkey_config.get("map_data_max_age", 86400)
+STALE_TTL = valkey_config.get("stale_ttl", 300)
+FRESHNESS_TTL = valkey_config.get("freshness_ttl", 60)
+MARKET_DATA_TTL = valkey_config.get("market_data_ttl", 120)
+VALKEY_CODEC = valkey_config.get("codec", "auto")
+VALKEY_COMPRESSION = valkey_config.get("compression", "auto")
+VALKEY_COMPRESSION_THRESHOLD = valkey_config.get("compression_threshold", 1024)
+L1_CACHE_ENABLED = valkey_config.get("l1_cache", True)
+L1_MAX_ENTRIES = valkey_config.get("l1_max_entries", 1024)
+L1_MAX_BYTES = valkey_config.get("l1_max_bytes", 64 * 1024 * 1024)
 SCREENSHOT_CACHE_ENABLED = valkey_config.get("screenshot_cache", True)
+SINGLE_FLIGHT_LOCK = valkey_config.get("single_flight_lock", True)
+SINGLE_FLIGHT_LOCK_TIMEOUT = valkey_config.get("single_flight_lock_timeout", 30)
 
 # Bubblemaps
 SUPPORTED_CHAINS = bubblemaps_config.get("supported_chains", [])
+CONCURRENT_CHAIN_LOOKUP = bubblemaps_config.get("concurrent_chain_lookup", True)
+CHAIN_LOOKUP_CONCURRENCY = bubblemaps_config.get("chain_lookup_concurrency", 5)
+MAP_INDEX_MAX_TOKENS = bubblemaps_config.get("map_index_max_tokens", 256)
+SNAPSHOT_MAX_TOKENS = bubblemaps_config.get("snapshot_max_tokens", 128)
 API_URLS = bubblemaps_config.get("api")
 BASE_API_URL = API_URLS.get("base_api_url")
 MAP_AVAILABILITY_URL = API_URLS.get("map_availability_url")
 MAP_METADATA_URL = API_URLS.get("map_metadata_url")
 IFRAME_TEMPLATE_URL = API_URLS.get("iframe_template_url")
 
+# HTTP client
+HTTP_POOL_LIMIT = http_config.get("pool_limit", 100)
+HTTP_POOL_LIMIT_PER_HOST = http_config.get("pool_limit_per_host", 20)
+HTTP_DNS_CACHE_TTL = http_config.get("dns_cache_ttl", 300)
+HTTP_KEEPALIVE_TIMEOUT = http_config.get("keepalive_timeout", 30)
+HTTP_TIMEOUT = http_config.get("timeout", 30)
+
+# Screenshot browser
+BROWSER_POOL_SIZE = browser_config.get("pool_size", 5)
+BROWSER_PAGE_MAX_RENDERS = browser_config.get("page_max_renders", 50)
+BROWSER_PAGE_MAX_HEAP_MB = browser_config.get("page_max_heap_mb", 256)
+BROWSER_RENDER_READINESS = browser_config.get("render_readiness", True)
+BROWSER_RENDER_TIMEOUT = browser_config.get("render_timeout", 30)
+BROWSER_RENDER_STABLE_MS = browser_config.get("render_stable_ms", 1500)
+BROWSER_RENDER_POLL_MS = browser_config.get("render_poll_ms", 250)
+RENDER_WORKERS = browser_config.get("workers", 1)
+RENDER_FARM_MODE = browser_config.get("farm_mode", "local")
+RENDER_JOB_TIMEOUT = browser_config.get("job_timeout", 120)
+RENDER_WORKER_MAX_FAILURES = browser_config.get("worker_max_failures", 3)
+RENDER_HEALTH_INTERVAL = browser_config.get("health_interval", 30)
+MAPSHOT_QUEUE_MAX_DEPTH = browser_config.get("queue_max_depth", 100)
+# Defaults to the local render capacity
+MAPSHOT_QUEUE_CONCURRENCY = (
+    browser_config.get("queue_concurrency") or RENDER_WORKERS * BROWSER_POOL_SIZE
+)
+PRERENDER_ENABLED = browser_config.get("prerender", True)
+PRERENDER_INTERVAL = browser_config.get("prerender_interval", 300)
+PRERENDER_TOKENS = browser_config.get("prerender_tokens", 20)
+PRERENDER_PER_HOUR = browser_config.get("prerender_per_hour", 30)
+PRERENDER_CONCURRENCY = browser_config.get("prerender_concurrency", 1)
+IMAGE_FORMAT = browser_config.get("image_format", "png")
+IMAGE_QUALITY = browser_config.get("image_quality", 80)
+IMAGE_MAX_WIDTH = browser_config.get("image_max_width", 0)
+IMAGE_MAX_HEIGHT = browser_config.get("image_max_height", 0)
+IMAGE_OPTIMIZE = browser_config.get("image_optimize", False)
+IMAGE_KEEP_ORIGINAL = browser_config.get("image_keep_original", False)
+
 application_defaults = Defaults(
     parse_mode=ParseMode.HTML,
     # disable_web_page_preview=True,
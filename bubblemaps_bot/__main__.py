@@ -13,16 +13,32 @@ from bubblemaps_bot import (
 )
 from bubblemaps_bot.db.session import init_db
 from bubblemaps_bot.handlers import get_all_handlers
-from bubblemaps_bot.utils.screenshot import init_browser
+from bubblemaps_bot.utils.http_client import init_http_session, shutdown_http_session
+from bubblemaps_bot.utils.mapshot_queue import mapshot_queue, shutdown_mapshot_queue
+from bubblemaps_bot.utils.prerender import init_prerender, shutdown_prerender
+from bubblemaps_bot.utils.render_farm import init_render_farm, shutdown_render_farm
 from bubblemaps_bot.utils.valkey import shutdown_valkey
 
-builder.post_shutdown(shutdown_valkey)
+
+async def post_shutdown(app: Application) -> None:
+    """Release long-lived resources once the application has stopped."""
+    await shutdown_prerender(app)
+    await shutdown_mapshot_queue(app)
+    await shutdown_render_farm(app)
+    await shutdown_http_session(app)
+    await shutdown_valkey(app)
+
+
+builder.post_shutdown(post_shutdown)
 application = builder.build()
 
 async def startup():
-    """Initialize the bot, browser, and set bot commands."""
+    """Initialize the bot, render workers, and set bot commands."""
     await init_db()
-    await init_browser()
+    await init_http_session()
+    await init_render_farm()
+    await mapshot_queue.start(application.bot)
+    init_prerender()
     bot_user = await application.bot.get_me()
     logger.info(f"[BUBBLEMAPS] Running as @{bot_user.username}")
 
@@ -35,7 +51,11 @@ async def startup():
         BotCommand("distribution", "Get token distribution info"),
         BotCommand("coin", "Price and market data"),
         BotCommand("address", "Fetch address details for a token"),
+        BotCommand("stats", "Holder concentration analytics"),
+        BotCommand("clusters", "Clusters of connected holders"),
+        BotCommand("wallet", "Tracked tokens held by an address"),
         BotCommand("clear", "Clear the Valkey cache"),
+        BotCommand("status", "Show connection pool and cache statistics"),
     ]
 
     try:
@@ -0,0 +1,199 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, false, func, or_, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from bubblemaps_bot.models.mapshot_jobs import MapshotJob, MapshotWaiter
+from bubblemaps_bot.db.session import async_session
+
+QUEUED = "queued"
+RUNNING = "running"
+
+
+def utcnow() -> datetime:
+    """
+    Current UTC time as stored in job timestamps.
+    Returns:
+        Naive UTC datetime; SQLite does not keep timezone offsets.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+async def lock_mapshot_jobs(session: AsyncSession):
+    """
+    Take the job table's write lock at the start of a transaction.
+    Joining a job and completing it then run one after the other, so no waiter
+    is added to a job whose waiters were already collected.
+    Args:
+        session: Session whose transaction holds the lock until commit.
+    """
+    if session.bind.dialect.name == "postgresql":
+        await session.execute(
+            text("LOCK TABLE mapshot_jobs IN SHARE ROW EXCLUSIVE MODE")
+        )
+    else:
+        # A first write statement makes SQLite begin a write transaction
+        await session.execute(
+            update(MapshotJob).where(false()).values(status=MapshotJob.status)
+        )
+
+
+async def enqueue_mapshot_job(
+    chain: str,
+    token_id: str,
+    version: str | None,
+    priority: int,
+    waiter: dict | None,
+    max_depth: int,
+) -> tuple[int | None, bool]:
+    """
+    Queue a mapshot job, joining an existing job for the same map version.
+    Args:
+        chain: Blockchain network identifier (e.g., 'eth').
+        token_id: Token address.
+        version: Map update date the screenshot is for.
+        priority: Lower runs first; a joined job keeps the most urgent priority.
+        waiter: Chat to deliver the result to (MapshotWaiter fields), or None.
+        max_depth: New jobs are refused once this many jobs are queued.
+    Returns:
+        tuple: (job id, whether a new job was created); job id is None if the
+        queue is full.
+    """
+    async with async_session() as session:
+        await lock_mapshot_jobs(session)
+        job = await session.scalar(
+            select(MapshotJob).where(
+                MapshotJob.chain == chain,
+                MapshotJob.token_id == token_id,
+                (
+                    MapshotJob.version.is_(None)
+                    if version is None
+                    else MapshotJob.version == version
+                ),
+                MapshotJob.status.in_([QUEUED, RUNNING]),
+            )
+        )
+        created = job is None
+        if created:
+            depth = await session.scalar(
+                select(func.count(MapshotJob.id)).where(MapshotJob.status == QUEUED)
+            )
+            if depth >= max_depth:
+                await session.rollback()
+                return None, False
+            job = MapshotJob(
+                chain=chain,
+                token_id=token_id,
+                version=version,
+                priority=priority,
+                status=QUEUED,
+                created_at=utcnow(),
+            )
+            session.add(job)
+            await session.flush()
+        elif priority < job.priority:
+            job.priority = priority
+
+        if waiter:
+            session.add(MapshotWaiter(job_id=job.id, **waiter))
+        await session.commit()
+        return job.id, created
+
+
+async def claim_next_mapshot_job(owner: str) -> MapshotJob | None:
+    """
+    Mark the most urgent queued job as running and return it.
+    Args:
+        owner: ID of the queue instance that will render the job.
+    Returns:
+        MapshotJob object if one was queued, else None.
+    """
+    async with async_session() as session:
+        while True:
+            job = await session.scalar(
+                select(MapshotJob)
+                .where(MapshotJob.status == QUEUED)
+                .order_by(MapshotJob.priority, MapshotJob.created_at)
+                .limit(1)
+            )
+            if job is None:
+                return None
+            claimed = await session.execute(
+                update(MapshotJob)
+                .where(MapshotJob.id == job.id, MapshotJob.status == QUEUED)
+                .values(status=RUNNING, owner=owner, heartbeat_at=utcnow())
+            )
+            await session.commit()
+            if claimed.rowcount:
+                return job
+
+
+async def complete_mapshot_job(job_id: int) -> list[MapshotWaiter]:
+    """
+    Remove a finished job and return the chats waiting for it.
+    Args:
+        job_id: Job ID.
+    Returns:
+        List of MapshotWaiter objects.
+    """
+    async with async_session() as session:
+        await lock_mapshot_jobs(session)
+        result = await session.execute(
+            select(MapshotWaiter).where(MapshotWaiter.job_id == job_id)
+        )
+        waiters = result.scalars().all()
+        await session.execute(delete(MapshotWaiter).where(MapshotWaiter.job_id == job_id))
+        await session.execute(delete(MapshotJob).where(MapshotJob.id == job_id))
+        await session.commit()
+        return waiters
+
+
+async def touch_mapshot_jobs(owner: str) -> None:
+    """
+    Refresh the heartbeat of every job an instance is rendering.
+    Args:
+        owner: ID of the queue instance.
+    """
+    async with async_session() as session:
+        await session.execute(
+            update(MapshotJob)
+            .where(MapshotJob.status == RUNNING, MapshotJob.owner == owner)
+            .values(heartbeat_at=utcnow())
+        )
+        await session.commit()
+
+
+async def requeue_running_mapshot_jobs(stale_after: float) -> int:
+    """
+    Put running jobs whose instance stopped sending heartbeats back in the queue.
+    Args:
+        stale_after: Seconds without heartbeat after which an instance is gone.
+    Returns:
+        Number of jobs requeued.
+    """
+    cutoff = utcnow() - timedelta(seconds=stale_after)
+    async with async_session() as session:
+        result = await session.execute(
+            update(MapshotJob)
+            .where(
+                MapshotJob.status == RUNNING,
+                or_(
+                    MapshotJob.heartbeat_at.is_(None),
+                    MapshotJob.heartbeat_at < cutoff,
+                ),
+            )
+            .values(status=QUEUED, owner=None, heartbeat_at=None)
+        )
+        await session.commit()
+        return result.rowcount
+
+
+async def count_mapshot_jobs() -> dict[str, int]:
+    """
+    Count pending jobs by status.
+    Returns:
+        Mapping of status to job count.
+    """
+    async with async_session() as session:
+        result = await session.execute(
+            select(MapshotJob.status, func.count()).group_by(MapshotJob.status)
+        )
+        return {status: count for status, count in result.all()}
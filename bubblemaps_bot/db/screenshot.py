@@ -1,7 +1,11 @@
 from sqlalchemy import select, update
 from sqlalchemy.exc import NoResultFound
 from datetime import datetime
-from bubblemaps_bot.models.screenshot import TokenScreenshot
+from bubblemaps_bot.models.screenshot import (
+    ScreenshotFileId,
+    TokenScreenshot,
+    TokenScreenshotOriginal,
+)
 from bubblemaps_bot.db.session import async_session
 
 
@@ -24,6 +28,24 @@ async def get_token_screenshot(chain: str, token_id: str) -> TokenScreenshot | N
         return result.scalar_one_or_none()
 
 
+async def get_token_screenshot_update_date(chain: str, token_id: str) -> datetime | None:
+    """
+    Retrieve only the update date of a stored screenshot, without the image data.
+    Args:
+        chain: Blockchain network identifier (e.g., 'eth').
+        token_id: Token address.
+    Returns:
+        Update date if a screenshot is stored, else None.
+    """
+    async with async_session() as session:
+        return await session.scalar(
+            select(TokenScreenshot.update_date).where(
+                TokenScreenshot.chain == chain,
+                TokenScreenshot.token_id == token_id
+            )
+        )
+
+
 async def upsert_token_screenshot(chain: str, token_id: str, update_date: datetime, image_data: bytes):
     """
     Insert or update a token screenshot in the database.
@@ -54,4 +76,114 @@ async def upsert_token_screenshot(chain: str, token_id: str, update_date: dateti
             )
             session.add(screenshot)
 
+        await session.commit()
+
+
+async def get_token_screenshot_original(chain: str, token_id: str) -> TokenScreenshotOriginal | None:
+    """
+    Retrieve the full resolution original of a re-encoded token screenshot.
+    Args:
+        chain: Blockchain network identifier (e.g., 'eth').
+        token_id: Token address.
+    Returns:
+        TokenScreenshotOriginal object if found, else None.
+    """
+    async with async_session() as session:
+        result = await session.execute(
+            select(TokenScreenshotOriginal).where(
+                TokenScreenshotOriginal.chain == chain,
+                TokenScreenshotOriginal.token_id == token_id
+            )
+        )
+        return result.scalar_one_or_none()
+
+
+async def upsert_token_screenshot_original(chain: str, token_id: str, update_date: datetime, image_data: bytes):
+    """
+    Insert or update the full resolution original of a token screenshot.
+    Args:
+        chain: Blockchain network identifier (e.g., 'eth').
+        token_id: Token address.
+        update_date: Timestamp of the screenshot update.
+        image_data: PNG image data as captured by the browser.
+    """
+    async with async_session() as session:
+        existing = await session.execute(
+            select(TokenScreenshotOriginal).where(
+                TokenScreenshotOriginal.chain == chain,
+                TokenScreenshotOriginal.token_id == token_id
+            )
+        )
+        original = existing.scalar_one_or_none()
+
+        if original:
+            original.update_date = update_date
+            original.image_data = image_data
+        else:
+            original = TokenScreenshotOriginal(
+                chain=chain,
+                token_id=token_id,
+                update_date=update_date,
+                image_data=image_data
+            )
+            session.add(original)
+
+        await session.commit()
+
+
+async def get_screenshot_file_id(chain: str, token_id: str, update_date: datetime, image_sha256: str) -> str | None:
+    """
+    Retrieve the Telegram file_id of an uploaded screenshot for a map version.
+    Args:
+        chain: Blockchain network identifier (e.g., 'eth').
+        token_id: Token address.
+        update_date: Map update date the screenshot shows.
+        image_sha256: SHA-256 hex digest of the image data.
+    Returns:
+        The file_id if this exact image was uploaded before, else None.
+    """
+    async with async_session() as session:
+        return await session.scalar(
+            select(ScreenshotFileId.file_id).where(
+                ScreenshotFileId.chain == chain,
+                ScreenshotFileId.token_id == token_id,
+                ScreenshotFileId.update_date == update_date,
+                ScreenshotFileId.image_sha256 == image_sha256
+            )
+        )
+
+
+async def upsert_screenshot_file_id(chain: str, token_id: str, update_date: datetime, image_sha256: str, file_id: str):
+    """
+    Insert or update the Telegram file_id of a token's latest uploaded screenshot.
+    Args:
+        chain: Blockchain network identifier (e.g., 'eth').
+        token_id: Token address.
+        update_date: Map update date the screenshot shows.
+        image_sha256: SHA-256 hex digest of the uploaded image data.
+        file_id: File ID returned by Telegram for the upload.
+    """
+    async with async_session() as session:
+        existing = await session.execute(
+            select(ScreenshotFileId).where(
+                ScreenshotFileId.chain == chain,
+                ScreenshotFileId.token_id == token_id
+            )
+        )
+        record = existing.scalar_one_or_none()
+
+        if record:
+            record.update_date = update_date
+            record.image_sha256 = image_sha256
+            record.file_id = file_id
+        else:
+            record = ScreenshotFileId(
+                chain=chain,
+                token_id=token_id,
+                update_date=update_date,
+                image_sha256=image_sha256,
+                file_id=file_id
+            )
+            session.add(record)
+
         await session.commit()
\ No newline at end of file
@@ -33,6 +33,21 @@ async def get_all_successful_tokens():
         return result.scalars().all()
 
 
+async def get_recent_successful_tokens(limit: int):
+    """
+    Retrieve the most recently resolved successful tokens.
+    Args:
+        limit: Maximum number of tokens to return.
+    Returns:
+        List of SuccessfulToken objects, newest first.
+    """
+    async with async_session() as session:
+        result = await session.execute(
+            select(SuccessfulToken).order_by(SuccessfulToken.id.desc()).limit(limit)
+        )
+        return result.scalars().all()
+
+
 async def get_successful_token(token_id: str, chain: str = None) -> SuccessfulToken | None:
     """
     Query the database for a specific successful token by token_id and optionally by chain.
@@ -0,0 +1,65 @@
+from sqlalchemy import delete, insert, select
+from bubblemaps_bot.models.wallets import WalletHolding
+from bubblemaps_bot.db.session import async_session
+
+
+async def get_indexed_version(chain: str, token_id: str) -> str | None:
+    """
+    Return the map version a token's holdings were last indexed from.
+    Args:
+        chain: Blockchain network identifier (e.g., 'eth').
+        token_id: Token address.
+    Returns:
+        The indexed dt_update, or None if the token is not indexed.
+    """
+    async with async_session() as session:
+        return await session.scalar(
+            select(WalletHolding.dt_update)
+            .where(WalletHolding.chain == chain, WalletHolding.token_id == token_id)
+            .limit(1)
+        )
+
+
+async def replace_token_holdings(
+    chain: str, token_id: str, dt_update: str | None, holdings: list[dict]
+):
+    """
+    Replace the indexed holders of one token in a single transaction.
+    Args:
+        chain: Blockchain network identifier (e.g., 'eth').
+        token_id: Token address.
+        dt_update: Map version the holdings were taken from.
+        holdings: Dicts with address, amount, percentage and rank.
+    """
+    async with async_session() as session:
+        await session.execute(
+            delete(WalletHolding).where(
+                WalletHolding.chain == chain, WalletHolding.token_id == token_id
+            )
+        )
+        if holdings:
+            await session.execute(
+                insert(WalletHolding),
+                [
+                    {**holding, "chain": chain, "token_id": token_id, "dt_update": dt_update}
+                    for holding in holdings
+                ],
+            )
+        await session.commit()
+
+
+async def get_wallet_holdings(address: str) -> list[WalletHolding]:
+    """
+    Retrieve every indexed token held by an address, largest share first.
+    Args:
+        address: Holder address.
+    Returns:
+        List of WalletHolding objects.
+    """
+    async with async_session() as session:
+        result = await session.execute(
+            select(WalletHolding)
+            .where(WalletHolding.address == address.lower())
+            .order_by(WalletHolding.percentage.desc())
+        )
+        return result.scalars().all()
@@ -9,6 +9,10 @@ from bubblemaps_bot.handlers import (
     distribution,
     valkey,
     super,
+    status,
+    stats,
+    clusters,
+    wallet,
 )
 
 
@@ -23,5 +27,9 @@ def get_all_handlers() -> list[BaseHandler]:
     handlers.extend(super.get_handlers())
     handlers.extend(valkey.get_handlers())
     handlers.extend(coingecko.get_handlers())
+    handlers.extend(status.get_handlers())
+    handlers.extend(stats.get_handlers())
+    handlers.extend(clusters.get_handlers())
+    handlers.extend(wallet.get_handlers())
 
     return handlers
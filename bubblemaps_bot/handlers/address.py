@@ -1,7 +1,10 @@
 from telegram import Update
 from telegram.ext import CommandHandler, ContextTypes
 
-from bubblemaps_bot.utils.bubblemaps_api import fetch_address_details
+from bubblemaps_bot.utils.bubblemaps_api import (
+    fetch_address_cluster,
+    fetch_address_details,
+)
 from bubblemaps_bot.utils.bubblemaps_metadata import fetch_metadata_from_all_chains
 
 
@@ -57,6 +60,13 @@ async def address_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         f"🔄 <b>Transaction Count:</b> {transaction_count}\n"
         f"📤 <b>Transfer Count:</b> {transfer_count}"
     )
+
+    cluster = await fetch_address_cluster(token, chain, address)
+    if cluster:
+        text += (
+            f"\n🕸 <b>Cluster:</b> #{cluster['rank']} "
+            f"({cluster['size']} wallets, {cluster['percentage']:.2f}% of supply)"
+        )
     await update.message.reply_text(text, parse_mode="HTML")
 
 
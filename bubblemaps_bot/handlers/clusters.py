@@ -0,0 +1,72 @@
+from telegram import Update
+from telegram.ext import CommandHandler, ContextTypes
+
+from bubblemaps_bot.utils.bubblemaps_api import fetch_clusters
+from bubblemaps_bot.utils.bubblemaps_metadata import fetch_metadata_from_all_chains
+
+TOP_CLUSTERS = 5
+MEMBERS_SHOWN = 3
+
+
+async def clusters_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Telegram command to show the largest clusters of connected holders for a token.
+    Usage: /clusters <token_address> or /clusters <chain> <token_address>
+    Examples:
+        /clusters 0x19de6b897ed14a376dda0fe53a5420d2ac828a28
+        /clusters eth 0x19de6b897ed14a376dda0fe53a5420d2ac828a28
+    """
+    if len(context.args) not in [1, 2]:
+        await update.message.reply_text(
+            "Usage: /clusters <token_address> or /clusters <chain> <token_address>"
+        )
+        return
+
+    if len(context.args) == 1:
+        token = context.args[0]
+        result = await fetch_metadata_from_all_chains(token)
+        if not result:
+            await update.message.reply_text(
+                "❌ Token not found on any supported chains."
+            )
+            return
+        chain, _ = result
+    else:
+        chain, token = context.args
+
+    result = await fetch_clusters(token, chain)
+    if result is None:
+        await update.message.reply_text(
+            f"❌ No holder data found for token {token} on chain {chain.upper()}."
+        )
+        return
+
+    clusters = result["clusters"]
+    text = (
+        f"<b>🕸 Holder Clusters</b>\n\n"
+        f"🔗 <b>Chain:</b> {chain.upper()}\n"
+        f"🏷️ <b>Token:</b> {token}\n"
+        f"🧮 <b>Clusters:</b> {len(clusters)} "
+        f"({sum(c['percentage'] for c in clusters):.2f}% of supply)\n\n"
+    )
+    if not clusters:
+        text += "No connected holders found."
+
+    for cluster in clusters[:TOP_CLUSTERS]:
+        text += (
+            f"<b>#{cluster['rank']}</b>: {cluster['size']} wallets, "
+            f"{cluster['percentage']:.2f}% of supply\n"
+        )
+        for address in cluster["members"][:MEMBERS_SHOWN]:
+            text += f"  • <code>{address}</code>\n"
+        if cluster["size"] > MEMBERS_SHOWN:
+            text += f"  • …and {cluster['size'] - MEMBERS_SHOWN} more\n"
+
+    await update.message.reply_text(text, parse_mode="HTML")
+
+
+def get_handlers():
+    """
+    Return handlers for the clusters command.
+    """
+    return [CommandHandler("clusters", clusters_command)]
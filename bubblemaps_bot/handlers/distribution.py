@@ -1,13 +1,13 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import CommandHandler, ContextTypes, CallbackQueryHandler
 from bubblemaps_bot.utils.bubblemaps_api import (
-    fetch_distribution,
+    acquire_distribution,
     fetch_address_details,
+    release_distribution,
+    resolve_distribution,
 )
 from bubblemaps_bot.utils.bubblemaps_metadata import fetch_metadata_from_all_chains
 
-ITEMS_PER_PAGE = 5
-
 
 async def distribution_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
@@ -35,20 +35,15 @@ async def distribution_command(update: Update, context: ContextTypes.DEFAULT_TYP
     else:
         chain, token = context.args
 
-    sorted_nodes = await fetch_distribution(token, chain)
-    if not sorted_nodes:
+    handle = await acquire_distribution(token, chain)
+    if not handle:
         await update.message.reply_text(
             f"❌ No distribution data found for token {token} on chain {chain.upper()}."
         )
         return
 
-    context.user_data["distribution"] = {
-        "chain": chain,
-        "token": token,
-        "nodes": sorted_nodes,
-        "page": 0,
-        "state": "distribution",
-    }
+    release_distribution(context.user_data.get("distribution"))
+    context.user_data["distribution"] = {**handle, "page": 0, "state": "distribution"}
 
     await send_distribution_page(update.message, context)
 
@@ -66,19 +61,19 @@ async def send_distribution_page(
 
     chain = data["chain"]
     token = data["token"]
-    sorted_nodes = data["nodes"]
     page = data["page"]
 
-    total_items = len(sorted_nodes)
-    start_idx = page * ITEMS_PER_PAGE
-    end_idx = min(start_idx + ITEMS_PER_PAGE, total_items)
-    current_nodes = sorted_nodes[start_idx:end_idx]
+    snapshot = await resolve_distribution(data)
+    if not snapshot:
+        await message.reply_text("❌ No distribution data available.")
+        return
+    current_nodes = [node for _, node, _ in snapshot.page(page)]
 
     text = (
         f"<b>📊 Token Distribution</b>\n"
         f"🔗 <b>Chain:</b> {chain.upper()}\n"
         f"🏷️ <b>Token:</b> {token}\n"
-        f"📋 <b>Page:</b> {page + 1}/{((total_items - 1) // ITEMS_PER_PAGE) + 1}\n\n"
+        f"📋 <b>Page:</b> {page + 1}/{snapshot.total_pages}\n\n"
     )
 
     keyboard = []
@@ -103,7 +98,7 @@ async def send_distribution_page(
         nav_buttons.append(
             InlineKeyboardButton("⬅️ Previous", callback_data=f"dist_prev_{page}")
         )
-    if end_idx < total_items:
+    if page + 1 < snapshot.total_pages:
         nav_buttons.append(
             InlineKeyboardButton("Next ➡️", callback_data=f"dist_next_{page}")
         )
@@ -240,7 +235,7 @@ Please re-send the /distribution command to check the various distribution relat
 
     if data == "dist_close":
         await query.delete_message()
-        context.user_data.pop("distribution", None)
+        release_distribution(context.user_data.pop("distribution", None))
         return
 
     elif data.startswith("dist_prev_") or data.startswith("dist_next_"):
@@ -1,61 +1,84 @@
-import asyncio
+from datetime import datetime
 
-from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
+from telegram import Bot, InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.constants import ChatType
 from telegram.ext import CallbackContext, CommandHandler
 
 from bubblemaps_bot import logger
+from bubblemaps_bot.models.mapshot_jobs import MapshotWaiter
 from bubblemaps_bot.utils.bubblemaps_metadata import fetch_metadata_from_all_chains
+from bubblemaps_bot.utils.mapshot_queue import QueueFull, mapshot_queue
 from bubblemaps_bot.utils.screenshot import (
     build_iframe_url,
-    capture_bubblemap,
     check_map_availability,
+    send_screenshot,
 )
 
 
-async def mapshot_worker(
-    please_wait_msg, update: Update, context: CallbackContext, chain: str, token: str
+async def deliver_mapshot(
+    bot: Bot,
+    waiter: MapshotWaiter,
+    chain: str,
+    token: str,
+    screenshot: bytes | None,
+    update_date: datetime | None,
 ):
     """
-    Worker function to generate and send a Bubblemap screenshot for a given chain and token.
+    Send a finished mapshot to a chat that requested it with /mapshot.
     Args:
-        please_wait_msg: Message indicating processing status.
-        update: Telegram update object.
-        context: Telegram callback context.
+        bot: Telegram bot.
+        waiter: Chat waiting for the mapshot.
         chain: Blockchain network identifier (e.g., 'eth').
         token: Token address.
+        screenshot: Screenshot image data, None if generation failed.
+        update_date: Map update date the screenshot shows.
     """
-    try:
-        screenshot = await capture_bubblemap(chain, token)
-        iframe_url = build_iframe_url(chain, token)
-
-        is_group = update.message.chat.type in [ChatType.GROUP, ChatType.SUPERGROUP]
-
-        if is_group:
-            keyboard = [[InlineKeyboardButton("🌐 View in Browser", url=iframe_url)]]
-        else:
-            keyboard = [
-                [
-                    InlineKeyboardButton("🌐 View in Browser", url=iframe_url),
-                    InlineKeyboardButton(
-                        "🫧 View in Telegram", web_app={"url": iframe_url}
-                    ),
-                ]
-            ]
+    if screenshot is None:
+        await bot.edit_message_text(
+            "❌ Failed to generate mapshot.",
+            chat_id=waiter.chat_id,
+            message_id=waiter.message_id,
+        )
+        return
+
+    iframe_url = build_iframe_url(chain, token)
 
-        markup = InlineKeyboardMarkup(keyboard)
+    if waiter.is_group:
+        keyboard = [[InlineKeyboardButton("🌐 View in Browser", url=iframe_url)]]
+    else:
+        keyboard = [
+            [
+                InlineKeyboardButton("🌐 View in Browser", url=iframe_url),
+                InlineKeyboardButton(
+                    "🫧 View in Telegram", web_app={"url": iframe_url}
+                ),
+            ]
+        ]
 
-        await please_wait_msg.delete()
+    markup = InlineKeyboardMarkup(keyboard)
 
-        await update.message.reply_photo(
-            photo=screenshot,
+    try:
+        await bot.delete_message(chat_id=waiter.chat_id, message_id=waiter.message_id)
+    except Exception as e:
+        logger.debug(f"Could not delete mapshot progress message: {e}")
+
+    await send_screenshot(
+        chain,
+        token,
+        update_date,
+        screenshot,
+        lambda photo: bot.send_photo(
+            chat_id=waiter.chat_id,
+            photo=photo,
             caption=f"🗺 Bubblemap preview for <code>{token}</code> on {chain.upper()}",
             reply_markup=markup,
+            reply_to_message_id=waiter.reply_to_message_id,
             parse_mode="HTML",
-        )
-    except Exception as e:
-        logger.error(f"Failed to generate mapshot for {chain}:{token}: {e}")
-        await please_wait_msg.edit_text("❌ Failed to generate mapshot.")
+        ),
+    )
+
+
+mapshot_queue.register("mapshot", deliver_mapshot)
 
 
 async def mapshot_command(update: Update, context: CallbackContext):
@@ -93,7 +116,26 @@ async def mapshot_command(update: Update, context: CallbackContext):
 
     please_wait_msg = await update.message.reply_text("⏳ Generating mapshot...")
 
-    asyncio.create_task(mapshot_worker(please_wait_msg, update, context, chain, token))
+    try:
+        await mapshot_queue.request(
+            chain,
+            token,
+            waiter={
+                "kind": "mapshot",
+                "chat_id": update.message.chat.id,
+                "message_id": please_wait_msg.message_id,
+                "reply_to_message_id": update.message.message_id,
+                "is_group": update.message.chat.type
+                in [ChatType.GROUP, ChatType.SUPERGROUP],
+            },
+        )
+    except QueueFull:
+        await please_wait_msg.edit_text(
+            "⏳ Too many mapshots are being generated right now, please try again later."
+        )
+    except Exception as e:
+        logger.error(f"Failed to queue mapshot for {chain}:{token}: {e}")
+        await please_wait_msg.edit_text("❌ Failed to generate mapshot.")
 
 
 def get_handlers():
@@ -48,7 +48,22 @@ Examples:
 <code>/address 0xa0b73e1ff0b80914ab6fe0444e65848c4c34450b 0xa023f08c70a23abc7edfc5b6b5e171d78dfc947e</code>
 <code>/address eth 0xa0b73e1ff0b80914ab6fe0444e65848c4c34450b 0xa023f08c70a23abc7edfc5b6b5e171d78dfc947e</code>
 
-<code>/clear</code> - Clear the Valkey cache
+<code>/stats token_address</code> or <code>/stats chain token_address</code> - Holder concentration analytics (Gini, Nakamoto, HHI, top holders)
+Examples:
+<code>/stats 0xa0b73e1ff0b80914ab6fe0444e65848c4c34450b</code>
+<code>/stats eth 0xa0b73e1ff0b80914ab6fe0444e65848c4c34450b</code>
+
+<code>/clusters token_address</code> or <code>/clusters chain token_address</code> - Largest clusters of holders connected by transfers
+Examples:
+<code>/clusters 0xa0b73e1ff0b80914ab6fe0444e65848c4c34450b</code>
+<code>/clusters eth 0xa0b73e1ff0b80914ab6fe0444e65848c4c34450b</code>
+
+<code>/wallet address</code> - Tracked tokens held by an address, across every map the bot has fetched
+Example:
+<code>/wallet 0x1ae3739e17d8500f2b2d80086ed092596a116e0b</code>
+
+<code>/clear</code> or <code>/clear token_address</code> - Clear the Valkey cache, or everything cached for one token
+<code>/status</code> - Show connection pool and cache statistics
 
 Please follow the format to use any desired command."""
 
@@ -0,0 +1,77 @@
+from telegram import Update
+from telegram.ext import CommandHandler, ContextTypes
+
+from bubblemaps_bot.utils.analytics import get_holder_stats
+from bubblemaps_bot.utils.bubblemaps_api import fetch_map_entry
+from bubblemaps_bot.utils.bubblemaps_metadata import fetch_metadata_from_all_chains
+
+
+def format_metrics(title: str, metrics: dict) -> str:
+    """
+    Format one set of concentration metrics.
+    Args:
+        title: Section title.
+        metrics: Metrics as returned by concentration_metrics.
+    Returns:
+        str: HTML formatted section.
+    """
+    return (
+        f"<b>{title}</b> ({metrics['holders']} holders)\n"
+        f"⚖️ <b>Gini:</b> {metrics['gini']:.4f}\n"
+        f"🏛 <b>Nakamoto:</b> {metrics['nakamoto']}\n"
+        f"📐 <b>HHI:</b> {metrics['hhi']:,.0f}\n"
+        f"🔝 <b>Top 10/50/100:</b> {metrics['top_10']:.2f}% / "
+        f"{metrics['top_50']:.2f}% / {metrics['top_100']:.2f}%"
+    )
+
+
+async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Telegram command to show holder concentration analytics for a token.
+    Usage: /stats <token_address> or /stats <chain> <token_address>
+    Examples:
+        /stats 0x19de6b897ed14a376dda0fe53a5420d2ac828a28
+        /stats eth 0x19de6b897ed14a376dda0fe53a5420d2ac828a28
+    """
+    if len(context.args) not in [1, 2]:
+        await update.message.reply_text(
+            "Usage: /stats <token_address> or /stats <chain> <token_address>"
+        )
+        return
+
+    if len(context.args) == 1:
+        token = context.args[0]
+        result = await fetch_metadata_from_all_chains(token)
+        if not result:
+            await update.message.reply_text(
+                "❌ Token not found on any supported chains."
+            )
+            return
+        chain, _ = result
+    else:
+        chain, token = context.args
+
+    entry = await fetch_map_entry(token, chain)
+    if not entry or not entry["data"].get("nodes"):
+        await update.message.reply_text(
+            f"❌ No holder data found for token {token} on chain {chain.upper()}."
+        )
+        return
+
+    stats = get_holder_stats(token, chain, entry)
+
+    text = (
+        f"<b>📈 Holder Concentration</b>\n\n"
+        f"🔗 <b>Chain:</b> {chain.upper()}\n"
+        f"🏷️ <b>Token:</b> {token}\n\n"
+        f"{format_metrics('All holders', stats['all'])}\n\n"
+        f"{format_metrics('Excluding contracts', stats['ex_contracts'])}"
+    )
+    await update.message.reply_text(text, parse_mode="HTML")
+
+
+def get_handlers():
+    """
+    Return handlers for the stats command.
+    """
+    return [CommandHandler("stats", stats_command)]
@@ -0,0 +1,274 @@
+from telegram import Update
+from telegram.ext import CommandHandler, ContextTypes
+
+from bubblemaps_bot import SUDO_USERS
+from bubblemaps_bot.utils.bubblemaps_metadata import freshness_stats
+from bubblemaps_bot.utils.http_client import get_pool_stats
+from bubblemaps_bot.utils.image_encoding import encoding_stats
+from bubblemaps_bot.utils.l1_cache import get_l1_stats
+from bubblemaps_bot.utils.mapshot_queue import mapshot_queue
+from bubblemaps_bot.utils.negative_cache import get_negative_cache_stats
+from bubblemaps_bot.utils.prerender import prerender_scheduler
+from bubblemaps_bot.utils.render_farm import render_farm
+from bubblemaps_bot.utils.render_readiness import render_times
+from bubblemaps_bot.utils.singleflight import get_single_flight_stats
+from bubblemaps_bot.utils.snapshots import distribution_snapshots
+from bubblemaps_bot.utils.valkey import get_codec_stats
+
+
+def format_http_stats() -> str:
+    """
+    Build the HTTP connection pool section of the status report.
+    Returns:
+        str: HTML formatted statistics.
+    """
+    pool = get_pool_stats()
+    hosts = "\n".join(
+        f"  • <code>{host}</code>: {count}"
+        for host, count in sorted(
+            pool["per_host"].items(), key=lambda x: x[1], reverse=True
+        )
+    )
+    return (
+        f"<b>🌐 HTTP Pool</b>\n"
+        f"Requests: {pool['requests']} (errors: {pool['errors']})\n"
+        f"In flight: {pool['in_flight']} (peak: {pool['peak_in_flight']})\n"
+        f"Idle connections: {pool['idle_connections']}\n"
+        f"Limits: {pool['limit']} total, {pool['limit_per_host']} per host\n"
+        f"{hosts}"
+    )
+
+
+def format_negative_cache_stats() -> str:
+    """
+    Build the negative cache section of the status report.
+    Returns:
+        str: HTML formatted statistics.
+    """
+    negative = get_negative_cache_stats()
+    return (
+        f"<b>🚫 Negative Cache</b>\n"
+        f"Upstream calls saved: {negative['hits']}\n"
+        f"Misses recorded: {negative['misses_recorded']}\n"
+        f"Local entries: {negative['local_entries']}"
+    )
+
+
+def format_freshness_stats() -> str:
+    """
+    Build the freshness oracle section of the status report.
+    Returns:
+        str: HTML formatted statistics.
+    """
+    return (
+        f"<b>🕒 Freshness Oracle</b>\n"
+        f"Update dates: {freshness_stats['update_hits']} hits / "
+        f"{freshness_stats['update_misses']} misses\n"
+        f"Availability: {freshness_stats['availability_hits']} hits / "
+        f"{freshness_stats['availability_misses']} misses"
+    )
+
+
+def format_single_flight_stats() -> str:
+    """
+    Build the request coalescing section of the status report.
+    Returns:
+        str: HTML formatted statistics.
+    """
+    flight = get_single_flight_stats()
+    return (
+        f"<b>🛬 Request Coalescing</b>\n"
+        f"Upstream fetches: {flight['leaders']}\n"
+        f"Coalesced callers: {flight['coalesced']}\n"
+        f"Cross-process waits: {flight['remote_waits']}\n"
+        f"In flight: {flight['in_flight']}"
+    )
+
+
+def format_l1_stats() -> str:
+    """
+    Build the in-process L1 cache section of the status report.
+    Returns:
+        str: HTML formatted statistics.
+    """
+    cache = get_l1_stats()
+    if cache is None:
+        return "<b>🧊 L1 Cache</b>\nDisabled"
+    return (
+        f"<b>🧊 L1 Cache</b>\n"
+        f"Hits: {cache['hits']} / Misses: {cache['misses']}\n"
+        f"Evictions: {cache['evictions']}\n"
+        f"Entries: {cache['entries']}/{cache['max_entries']}\n"
+        f"Size: {cache['bytes'] / 1024 / 1024:.1f}/{cache['max_bytes'] / 1024 / 1024:.1f} MB"
+    )
+
+
+def format_codec_stats() -> str:
+    """
+    Build the cache codec section of the status report.
+    Returns:
+        str: HTML formatted statistics.
+    """
+    codec = get_codec_stats()
+    ratio = codec["stored_bytes"] / codec["raw_bytes"] if codec["raw_bytes"] else 1
+    return (
+        f"<b>🗜 Cache Codec</b>\n"
+        f"Format: {codec['serializer']} + {codec['compressor']}\n"
+        f"Entries encoded: {codec['encoded']}\n"
+        f"Stored/raw size: {ratio:.0%}"
+    )
+
+
+def format_snapshot_stats() -> str:
+    """
+    Build the distribution snapshot section of the status report.
+    Returns:
+        str: HTML formatted statistics.
+    """
+    snapshots = distribution_snapshots.stats()
+    return (
+        f"<b>📊 Distribution Snapshots</b>\n"
+        f"Snapshots: {snapshots['snapshots']}/{snapshots['max_tokens']}\n"
+        f"Live sessions: {snapshots['sessions']}\n"
+        f"Evictions: {snapshots['evictions']}"
+    )
+
+
+def format_render_farm_stats() -> str:
+    """
+    Build the render farm section of the status report.
+    Returns:
+        str: HTML formatted statistics.
+    """
+    farm = render_farm.stats()
+    if farm["mode"] == "remote":
+        return (
+            f"<b>🖥 Render Farm</b>\n"
+            f"Mode: remote\n"
+            f"Jobs sent: {farm['remote_jobs']}"
+        )
+    workers = "\n".join(
+        f"  • #{worker['index']} {'🟢' if worker['connected'] else '🔴'} "
+        f"pages {worker['pool']['in_use']}/{worker['pool']['size']} "
+        f"(idle: {worker['pool']['idle']}), renders: {worker['renders']}, "
+        f"recycled: {worker['pool']['recycled']}, restarts: {worker['restarts']}"
+        for worker in farm["workers"]
+    )
+    return (
+        f"<b>🖥 Render Farm</b>\n"
+        f"Mode: local, queued: {farm['queued']}\n"
+        f"{workers}"
+    )
+
+
+def format_render_stats() -> str:
+    """
+    Build the screenshot render time section of the status report.
+    Returns:
+        str: HTML formatted statistics.
+    """
+    renders = render_times.stats()
+    outcomes = ", ".join(
+        f"{outcome}: {count}" for outcome, count in renders["outcomes"].items()
+    )
+    slowest = "\n".join(
+        f"  • <code>{token}</code>: {seconds:.1f}s"
+        for token, seconds in renders["slowest"]
+    )
+    return (
+        f"<b>⏱ Render Times</b>\n"
+        f"Renders: {renders['renders']} (avg: {renders['average']:.1f}s)\n"
+        f"Readiness: {outcomes or 'n/a'}\n"
+        f"{slowest}"
+    )
+
+
+def format_encoding_stats() -> str:
+    """
+    Build the screenshot encoding section of the status report.
+    Returns:
+        str: HTML formatted statistics.
+    """
+    encoding = encoding_stats.stats()
+    ratio = (
+        encoding["encoded_bytes"] / encoding["raw_bytes"]
+        if encoding["raw_bytes"]
+        else 1
+    )
+    saved = (encoding["raw_bytes"] - encoding["encoded_bytes"]) / 1024 / 1024
+    return (
+        f"<b>🖼 Image Encoding</b>\n"
+        f"Format: {encoding['format']} (quality: {encoding['quality']})\n"
+        f"Screenshots: {encoding['encoded']} (failed: {encoding['failed']})\n"
+        f"Encoded/captured size: {ratio:.0%}, saved {saved:.1f} MB\n"
+        f"Encode time: avg {encoding['average_time'] * 1000:.0f} ms"
+    )
+
+
+async def format_mapshot_queue_stats() -> str:
+    """
+    Build the mapshot job queue section of the status report.
+    Returns:
+        str: HTML formatted statistics.
+    """
+    queue = await mapshot_queue.stats()
+    return (
+        f"<b>📬 Mapshot Queue</b>\n"
+        f"Queued: {queue['depth'].get('queued', 0)}/{queue['max_depth']}, "
+        f"rendering: {queue['running']}/{queue['concurrency']}\n"
+        f"Served from storage: {queue['stored']}\n"
+        f"Jobs: {queue['submitted']} (deduplicated: {queue['deduplicated']}, "
+        f"rejected: {queue['rejected']})\n"
+        f"Completed: {queue['completed']} (failed: {queue['failed']})\n"
+        f"Wait: avg {queue['average_wait']:.1f}s, max {queue['max_wait']:.1f}s"
+    )
+
+
+def format_prerender_stats() -> str:
+    """
+    Build the background pre-rendering section of the status report.
+    Returns:
+        str: HTML formatted statistics.
+    """
+    prerender = prerender_scheduler.stats()
+    if not prerender["enabled"]:
+        return "<b>🔥 Pre-rendering</b>\nDisabled"
+    return (
+        f"<b>🔥 Pre-rendering</b>\n"
+        f"Cycles: {prerender['cycles']} (deferred: {prerender['deferred']})\n"
+        f"Tokens checked: {prerender['checked']}, rendered: {prerender['rendered']}\n"
+        f"In flight: {prerender['in_flight']}, "
+        f"budget left: {prerender['budget_left']}/{prerender['per_hour']} per hour"
+    )
+
+
+async def status_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Telegram command to show runtime statistics, restricted to sudo users.
+    Usage: /status
+    """
+    if update.effective_user.id not in SUDO_USERS:
+        return
+
+    sections = [
+        format_http_stats(),
+        format_l1_stats(),
+        format_codec_stats(),
+        format_negative_cache_stats(),
+        format_freshness_stats(),
+        format_single_flight_stats(),
+        format_snapshot_stats(),
+        format_render_farm_stats(),
+        await format_mapshot_queue_stats(),
+        format_prerender_stats(),
+        format_render_stats(),
+        format_encoding_stats(),
+    ]
+    await update.message.reply_text("\n\n".join(sections), parse_mode="HTML")
+
+
+def get_handlers():
+    """
+    Return handlers for the status command.
+    """
+    return [CommandHandler("status", status_command)]
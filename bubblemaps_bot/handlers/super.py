@@ -1,7 +1,7 @@
-import asyncio
 from datetime import datetime
 
 from telegram import (
+    Bot,
     CallbackQuery,
     InlineKeyboardButton,
     InlineKeyboardMarkup,
@@ -13,15 +13,18 @@ from telegram.constants import ParseMode
 from telegram.ext import CallbackQueryHandler, CommandHandler, ContextTypes
 
 from bubblemaps_bot import logger
+from bubblemaps_bot.models.mapshot_jobs import MapshotWaiter
 from bubblemaps_bot.utils.bubblemaps_api import (
+    acquire_distribution,
     fetch_address_details,
-    fetch_distribution,
+    release_distribution,
+    resolve_distribution,
 )
 from bubblemaps_bot.utils.bubblemaps_metadata import fetch_metadata_from_all_chains
 from bubblemaps_bot.utils.coingecko_api import get_market_data
-from bubblemaps_bot.utils.screenshot import build_iframe_url, capture_bubblemap
-
-ITEMS_PER_PAGE = 5
+from bubblemaps_bot.utils.image_encoding import image_extension
+from bubblemaps_bot.utils.mapshot_queue import QueueFull, mapshot_queue
+from bubblemaps_bot.utils.screenshot import build_iframe_url, send_screenshot
 
 
 async def check_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -45,6 +48,8 @@ async def check_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
 
     chain, metadata = result
 
+    previous = context.user_data.get(update.effective_chat.id, {}).get("check", {})
+    release_distribution(previous.get("distribution"))
     context.user_data[update.effective_chat.id] = {}
     context.user_data[update.effective_chat.id]["check"] = {
         "token": token,
@@ -131,69 +136,87 @@ Please re-send the /check command to check the various information."
                 )
 
 
-async def generate_bubblemap_send(chain: str, token: str, query: CallbackQuery) -> None:
+async def deliver_check_mapshot(
+    bot: Bot,
+    waiter: MapshotWaiter,
+    chain: str,
+    token: str,
+    screenshot: bytes | None,
+    update_date: datetime | None,
+) -> None:
     """
-    Generate and send bubblemap screenshot.
+    Show a finished mapshot in the /check message that requested it.
     Args:
+        bot: Telegram bot.
+        waiter: Chat and message waiting for the mapshot.
         chain: Blockchain network identifier.
         token: Token address.
-        query: Telegram CallbackQuery object.
+        screenshot: Screenshot image data, None if generation failed.
+        update_date: Map update date the screenshot shows.
     """
-    try:
-        screenshot = await capture_bubblemap(chain, token)
-        iframe_url = build_iframe_url(chain, token)
-
-        is_group = query.message.chat.type in ["group", "supergroup"]
-
-        if is_group:
-            keyboard = [
-                [InlineKeyboardButton("🌐 View in Browser", url=iframe_url)],
-                [
-                    InlineKeyboardButton("❌ Close", callback_data="check_close"),
-                    InlineKeyboardButton("⬅️ Go Back", callback_data="check_back_bmap"),
-                ],
-            ]
-        else:
-            keyboard = [
-                [
-                    InlineKeyboardButton("🌐 View in Browser", url=iframe_url),
-                    InlineKeyboardButton(
-                        "🫧 View in Telegram", web_app={"url": iframe_url}
-                    ),
-                ],
-                [
-                    InlineKeyboardButton("❌ Close", callback_data="check_close"),
-                    InlineKeyboardButton("⬅️ Go Back", callback_data="check_back_bmap"),
-                ],
-            ]
+    if screenshot is None:
+        await bot.edit_message_text(
+            "❌ Mapshot failed due to some unforseen reason",
+            chat_id=waiter.chat_id,
+            message_id=waiter.message_id,
+            reply_markup=InlineKeyboardMarkup(
+                [[InlineKeyboardButton("⬅️ Go Back", callback_data="check_back_bmap")]]
+            ),
+        )
+        return
 
-        markup = InlineKeyboardMarkup(keyboard)
+    iframe_url = build_iframe_url(chain, token)
 
-        await query.edit_message_media(
+    if waiter.is_group:
+        keyboard = [
+            [InlineKeyboardButton("🌐 View in Browser", url=iframe_url)],
+            [
+                InlineKeyboardButton("❌ Close", callback_data="check_close"),
+                InlineKeyboardButton("⬅️ Go Back", callback_data="check_back_bmap"),
+            ],
+        ]
+    else:
+        keyboard = [
+            [
+                InlineKeyboardButton("🌐 View in Browser", url=iframe_url),
+                InlineKeyboardButton(
+                    "🫧 View in Telegram", web_app={"url": iframe_url}
+                ),
+            ],
+            [
+                InlineKeyboardButton("❌ Close", callback_data="check_close"),
+                InlineKeyboardButton("⬅️ Go Back", callback_data="check_back_bmap"),
+            ],
+        ]
+
+    markup = InlineKeyboardMarkup(keyboard)
+
+    await send_screenshot(
+        chain,
+        token,
+        update_date,
+        screenshot,
+        lambda photo: bot.edit_message_media(
             media=InputMediaPhoto(
-                media=screenshot,
+                media=photo,
                 caption=f"🗺 Bubblemap for <code>{token}</code> on {chain.upper()}",
                 parse_mode=ParseMode.HTML,
-                filename=f"output_bmap_{chain}_{token}.png",
+                filename=f"output_bmap_{chain}_{token}.{image_extension(screenshot)}",
             ),
+            chat_id=waiter.chat_id,
+            message_id=waiter.message_id,
             reply_markup=markup,
-        )
-    except Exception as ex:
-        await query.edit_message_text(
-            "❌ Mapshot failed due to some unforseen reason",
-            reply_markup=InlineKeyboardMarkup(
-                [[InlineKeyboardButton("⬅️ Go Back", callback_data="check_back_bmap")]]
-            ),
-        )
-        await logger.error(
-            f"Exception occurred while generating a mapshot, for chain: {chain}, token: {token}\n\
-Actual exception: {ex}"
-        )
+        ),
+    )
+
+
+mapshot_queue.register("check", deliver_check_mapshot)
 
 
 async def send_mapshot(query: CallbackQuery, context: ContextTypes.DEFAULT_TYPE):
     """
-    Initiate bubblemap screenshot generation and sending.
+    Send a stored bubblemap screenshot or queue its generation; the result
+    replaces the menu message.
     Args:
         query: Telegram CallbackQuery object.
         context: Telegram context.
@@ -203,7 +226,32 @@ async def send_mapshot(query: CallbackQuery, context: ContextTypes.DEFAULT_TYPE)
     token = data["token"]
 
     await query.edit_message_text("⏳ Please wait while a bubblemap is generated...")
-    asyncio.create_task(generate_bubblemap_send(chain=chain, token=token, query=query))
+    try:
+        await mapshot_queue.request(
+            chain,
+            token,
+            waiter={
+                "kind": "check",
+                "chat_id": query.message.chat.id,
+                "message_id": query.message.message_id,
+                "is_group": query.message.chat.type in ["group", "supergroup"],
+            },
+        )
+    except Exception as ex:
+        busy = isinstance(ex, QueueFull)
+        await query.edit_message_text(
+            "⏳ Too many mapshots are being generated right now, please try again later."
+            if busy
+            else "❌ Mapshot failed due to some unforseen reason",
+            reply_markup=InlineKeyboardMarkup(
+                [[InlineKeyboardButton("⬅️ Go Back", callback_data="check_back_bmap")]]
+            ),
+        )
+        if not busy:
+            logger.error(
+                f"Exception occurred while queueing a mapshot, for chain: {chain}, token: {token}\n\
+Actual exception: {ex}"
+            )
 
 
 async def send_distribution_page(
@@ -221,31 +269,32 @@ async def send_distribution_page(
     elif isinstance(message_query, CallbackQuery):
         data = context.user_data[message_query.message.chat.id].get("check", {})
 
-    if not data.get("distribution"):
-        sorted_nodes = await fetch_distribution(data["token"], data["chain"])
-        if not sorted_nodes:
-            if isinstance(message_query, Message):
-                await message_query.edit_text("❌ No distribution data found.")
-            elif isinstance(message_query, CallbackQuery):
-                await message_query.edit_message_text("❌ No distribution data found.")
-            return
-        data["distribution"] = {"nodes": sorted_nodes, "page": 0}
+    snapshot = None
+    if data.get("distribution"):
+        snapshot = await resolve_distribution(data["distribution"])
+    else:
+        handle = await acquire_distribution(data["token"], data["chain"])
+        if handle:
+            data["distribution"] = {**handle, "page": 0}
+            snapshot = await resolve_distribution(data["distribution"])
+
+    if not snapshot:
+        if isinstance(message_query, Message):
+            await message_query.edit_text("❌ No distribution data found.")
+        elif isinstance(message_query, CallbackQuery):
+            await message_query.edit_message_text("❌ No distribution data found.")
+        return
 
     chain = data["chain"]
     token = data["token"]
-    sorted_nodes = data["distribution"]["nodes"]
     page = data["distribution"]["page"]
-
-    total_items = len(sorted_nodes)
-    start_idx = page * ITEMS_PER_PAGE
-    end_idx = min(start_idx + ITEMS_PER_PAGE, total_items)
-    current_nodes = sorted_nodes[start_idx:end_idx]
+    current_nodes = [node for _, node, _ in snapshot.page(page)]
 
     text = (
         f"<b>📊 Token Distribution</b>\n"
         f"🔗 <b>Chain:</b> {chain.upper()}\n"
         f"🏷️ <b>Token:</b> {token}\n"
-        f"📋 <b>Page:</b> {page + 1}/{((total_items - 1) // ITEMS_PER_PAGE) + 1}\n\n"
+        f"📋 <b>Page:</b> {page + 1}/{snapshot.total_pages}\n\n"
     )
 
     keyboard = []
@@ -269,7 +318,7 @@ async def send_distribution_page(
         nav_buttons.append(
             InlineKeyboardButton("⬅️ Prev", callback_data=f"check_dist_prev_{page}")
         )
-    if end_idx < total_items:
+    if page + 1 < snapshot.total_pages:
         nav_buttons.append(
             InlineKeyboardButton("Next ➡️", callback_data=f"check_dist_next_{page}")
         )
@@ -521,6 +570,7 @@ Please re-send the /check command to check the various information."
         if check_data.get(
             "message_id"
         ) is None or query.message.message_id == check_data.get("message_id"):
+            release_distribution(check_data.get("distribution"))
             context.user_data[update.effective_chat.id].pop("check", None)
         return
 
@@ -567,7 +617,7 @@ Please re-send the /check command to check the various information."
         else:
             check_data["state"] = "main_menu"
             if "distribution" in check_data:
-                check_data.pop("distribution")
+                release_distribution(check_data.pop("distribution"))
             if data == "check_back_bmap":
                 await send_main_menu(query, context, bmap_back=True)
             else:
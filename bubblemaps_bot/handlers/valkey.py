@@ -2,33 +2,63 @@ from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.ext import CallbackQueryHandler, CommandHandler, ContextTypes
 
 from bubblemaps_bot import SUDO_USERS
-from bubblemaps_bot.utils.valkey import valkey
+from bubblemaps_bot.utils.valkey import (
+    NAMESPACES,
+    invalidate_namespace,
+    invalidate_token,
+    valkey,
+)
 
 
 async def clear_cache_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
-    Telegram command to initiate clearing of Valkey cache, restricted to sudo users.
-    Usage: /clear
+    Telegram command to invalidate cached data, restricted to sudo users.
+    Usage: /clear or /clear <token_address>
+    Examples:
+        /clear
+        /clear 0x19de6b897ed14a376dda0fe53a5420d2ac828a28
     """
     user_id = update.effective_user.id
 
     if user_id not in SUDO_USERS:
         return
 
-    if not valkey:
-        await update.message.reply_text("⚠️ Valkey is not enabled or not connected.")
+    # Without Valkey only the in-process caches are cleared
+    if context.args:
+        token = context.args[0]
+        try:
+            removed = await invalidate_token(token)
+            cleared = (
+                f"{removed} cached entries" if valkey else "in-process cached entries"
+            )
+            await update.message.reply_text(
+                f"✅ Cleared {cleared} for <code>{token}</code>.",
+                parse_mode="HTML",
+            )
+        except Exception as e:
+            await update.message.reply_text(f"❌ Failed to clear cache: {e}")
         return
 
     keyboard = InlineKeyboardMarkup(
         [
             [
-                InlineKeyboardButton("✅ Yes", callback_data="confirm_clear_cache"),
+                InlineKeyboardButton(
+                    f"🧹 {namespace.capitalize()}",
+                    callback_data=f"clear_ns_{namespace}",
+                )
+            ]
+            for namespace in NAMESPACES
+        ]
+        + [
+            [
+                InlineKeyboardButton("✅ All", callback_data="clear_ns_all"),
                 InlineKeyboardButton("❌ No", callback_data="cancel_clear_cache"),
             ]
         ]
     )
+    cache = "Valkey" if valkey else "in-process"
     await update.message.reply_text(
-        "Are you sure you want to clear the Valkey cache?", reply_markup=keyboard
+        f"Which part of the {cache} cache do you want to clear?", reply_markup=keyboard
     )
 
 
@@ -43,16 +73,18 @@ async def handle_callback_query(update: Update, context: ContextTypes.DEFAULT_TY
     user_id = query.from_user.id
     await query.answer()
 
-    if query.data == "confirm_clear_cache":
+    if query.data.startswith("clear_ns_"):
         if user_id in SUDO_USERS:
-            if valkey:
-                try:
-                    await valkey.flushdb()
-                    await query.edit_message_text("✅ Valkey cache has been cleared.")
-                except Exception as e:
-                    await query.edit_message_text(f"❌ Failed to clear cache: {e}")
-            else:
-                await query.edit_message_text("⚠️ Valkey is not enabled.")
+            namespace = query.data.replace("clear_ns_", "")
+            targets = NAMESPACES if namespace == "all" else [namespace]
+            try:
+                for target in targets:
+                    await invalidate_namespace(target)
+                await query.edit_message_text(
+                    f"✅ Cleared cache: {', '.join(targets)}."
+                )
+            except Exception as e:
+                await query.edit_message_text(f"❌ Failed to clear cache: {e}")
         else:
             await query.edit_message_text(
                 "🚫 You are not authorized to perform this action."
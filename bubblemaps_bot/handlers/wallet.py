@@ -0,0 +1,50 @@
+from telegram import Update
+from telegram.ext import CommandHandler, ContextTypes
+
+from bubblemaps_bot.db.wallets import get_wallet_holdings
+
+MAX_HOLDINGS = 20
+
+
+async def wallet_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Telegram command to list the tracked tokens held by an address.
+    Answers from the reverse index built as map data is ingested, so only
+    tokens whose maps the bot has fetched are listed.
+    Usage: /wallet <address>
+    Example:
+        /wallet 0x1ae3739e17d8500f2b2d80086ed092596a116e0b
+    """
+    if len(context.args) != 1:
+        await update.message.reply_text("Usage: /wallet <address>")
+        return
+
+    address = context.args[0]
+    holdings = await get_wallet_holdings(address)
+    if not holdings:
+        await update.message.reply_text(
+            f"❌ Address {address} does not hold any tracked token."
+        )
+        return
+
+    text = (
+        f"<b>👛 Wallet Holdings</b>\n\n"
+        f"📍 <b>Address:</b> {address}\n"
+        f"🏷️ <b>Tokens:</b> {len(holdings)}\n\n"
+    )
+    for holding in holdings[:MAX_HOLDINGS]:
+        text += (
+            f"🔗 <b>{holding.chain.upper()}</b> <code>{holding.token_id}</code>\n"
+            f"  #{holding.rank} • {holding.amount:,.2f} • {holding.percentage:.4f}%\n"
+        )
+    if len(holdings) > MAX_HOLDINGS:
+        text += f"\n…and {len(holdings) - MAX_HOLDINGS} more"
+
+    await update.message.reply_text(text, parse_mode="HTML")
+
+
+def get_handlers():
+    """
+    Return handlers for the wallet command.
+    """
+    return [CommandHandler("wallet", wallet_command)]
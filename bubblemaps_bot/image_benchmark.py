@@ -0,0 +1,85 @@
+import argparse
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from bubblemaps_bot.utils.image_encoding import Image, encode_image, image_dimensions
+
+# (format, quality) pairs compared by default
+VARIANTS: List[Tuple[str, int]] = [
+    ("png", 0),
+    ("webp", 90),
+    ("webp", 80),
+    ("webp", 60),
+    ("jpeg", 90),
+    ("jpeg", 80),
+    ("jpeg", 60),
+]
+
+
+def benchmark(
+    images: List[bytes], max_width: int, max_height: int, optimize: bool, runs: int
+) -> List[Tuple[str, int, float]]:
+    """
+    Encode every image with every variant and measure size and time.
+    Args:
+        images: Captured PNG screenshots.
+        max_width: Maximum width in pixels, 0 for no limit.
+        max_height: Maximum height in pixels, 0 for no limit.
+        optimize: Spend more CPU for smaller files.
+        runs: Number of encodes per image and variant; the fastest one is kept.
+    Returns:
+        list: (variant, total encoded bytes, average seconds per image) tuples.
+    """
+    results = []
+    for fmt, quality in VARIANTS:
+        total_bytes, total_time = 0, 0.0
+        for image in images:
+            best = float("inf")
+            for _ in range(runs):
+                start = time.perf_counter()
+                encoded = encode_image(
+                    image, fmt, quality, max_width, max_height, optimize
+                )
+                best = min(best, time.perf_counter() - start)
+            total_bytes += len(encoded)
+            total_time += best
+        name = f"{fmt} q{quality}" if fmt != "png" else "png"
+        results.append((name, total_bytes, total_time / len(images)))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare screenshot encodings by size and encode time."
+    )
+    parser.add_argument("images", nargs="+", type=Path, help="PNG screenshots")
+    parser.add_argument("--max-width", type=int, default=0)
+    parser.add_argument("--max-height", type=int, default=0)
+    parser.add_argument("--no-optimize", action="store_true")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    if Image is None:
+        parser.error("Pillow is required, install it with: pip install Pillow")
+
+    images = [path.read_bytes() for path in args.images]
+    raw = sum(len(image) for image in images)
+    width, height = image_dimensions(images[0])
+    print(
+        f"{len(images)} image(s), {raw / 1024:.0f} KiB captured "
+        f"(first: {width}x{height})"
+    )
+
+    print(f"{'variant':<10} {'KiB':>8} {'saved':>7} {'ms/image':>9}")
+    for name, size, seconds in benchmark(
+        images, args.max_width, args.max_height, not args.no_optimize, args.runs
+    ):
+        print(
+            f"{name:<10} {size / 1024:>8.0f} {1 - size / raw:>7.0%} "
+            f"{seconds * 1000:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+from datetime import datetime
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    func,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+from bubblemaps_bot.db.base import BASE
+
+class MapshotJob(BASE):
+    __tablename__ = "mapshot_jobs"
+    __table_args__ = (
+        Index("ix_mapshot_jobs_next", "status", "priority", "created_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    chain: Mapped[str] = mapped_column(String)
+    token_id: Mapped[str] = mapped_column(String)
+    version: Mapped[str | None] = mapped_column(String, nullable=True)
+    priority: Mapped[int] = mapped_column(Integer)
+    status: Mapped[str] = mapped_column(String)
+    created_at: Mapped[datetime] = mapped_column(DateTime)
+    # Queue instance rendering the job and when it last reported being alive
+    owner: Mapped[str | None] = mapped_column(String, nullable=True)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
+# At most one active job per map version; completed jobs are deleted
+ACTIVE_JOB = MapshotJob.status.in_(["queued", "running"])
+Index(
+    "ux_mapshot_jobs_active",
+    MapshotJob.chain,
+    MapshotJob.token_id,
+    func.coalesce(MapshotJob.version, ""),
+    unique=True,
+    sqlite_where=ACTIVE_JOB,
+    postgresql_where=ACTIVE_JOB,
+)
+
+
+class MapshotWaiter(BASE):
+    __tablename__ = "mapshot_waiters"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    job_id: Mapped[int] = mapped_column(
+        ForeignKey("mapshot_jobs.id", ondelete="CASCADE"), index=True
+    )
+    kind: Mapped[str] = mapped_column(String)
+    chat_id: Mapped[int] = mapped_column(BigInteger)
+    message_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    reply_to_message_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    is_group: Mapped[bool] = mapped_column(Boolean, default=False)
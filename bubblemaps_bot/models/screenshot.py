@@ -10,4 +10,23 @@ class TokenScreenshot(BASE):
     chain: Mapped[str] = mapped_column(String)
     token_id: Mapped[str] = mapped_column(String)
     update_date: Mapped[datetime] = mapped_column(DateTime)
-    image_data: Mapped[bytes] = mapped_column(LargeBinary)
\ No newline at end of file
+    image_data: Mapped[bytes] = mapped_column(LargeBinary)
+
+class TokenScreenshotOriginal(BASE):
+    __tablename__ = "token_screenshot_originals"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    chain: Mapped[str] = mapped_column(String)
+    token_id: Mapped[str] = mapped_column(String)
+    update_date: Mapped[datetime] = mapped_column(DateTime)
+    image_data: Mapped[bytes] = mapped_column(LargeBinary)
+
+class ScreenshotFileId(BASE):
+    __tablename__ = "screenshot_file_ids"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    chain: Mapped[str] = mapped_column(String)
+    token_id: Mapped[str] = mapped_column(String)
+    update_date: Mapped[datetime] = mapped_column(DateTime)
+    image_sha256: Mapped[str | None] = mapped_column(String, nullable=True)
+    file_id: Mapped[str] = mapped_column(String)
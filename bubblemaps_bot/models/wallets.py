@@ -0,0 +1,19 @@
+from sqlalchemy import Float, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from bubblemaps_bot.db.base import BASE
+
+class WalletHolding(BASE):
+    __tablename__ = "wallet_holdings"
+    __table_args__ = (
+        Index("ix_wallet_holdings_address", "address"),
+        Index("ix_wallet_holdings_token", "chain", "token_id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    address: Mapped[str] = mapped_column(String)
+    chain: Mapped[str] = mapped_column(String)
+    token_id: Mapped[str] = mapped_column(String)
+    amount: Mapped[float] = mapped_column(Float)
+    percentage: Mapped[float] = mapped_column(Float)
+    rank: Mapped[int] = mapped_column(Integer)
+    dt_update: Mapped[str | None] = mapped_column(String, nullable=True)
@@ -0,0 +1,27 @@
+import asyncio
+
+from bubblemaps_bot import logger
+from bubblemaps_bot.utils.render_farm import render_farm
+from bubblemaps_bot.utils.valkey import valkey
+
+
+async def run():
+    """Render mapshot jobs queued in Valkey by bots running in remote mode."""
+    if valkey is None:
+        logger.error("[RENDER] Render workers need Valkey enabled in config.yaml")
+        return
+    try:
+        await render_farm.serve()
+    finally:
+        await render_farm.stop()
+        await valkey.aclose(close_connection_pool=True)
+
+
+def main():
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        logger.info("[RENDER] Render worker stopped by user")
+
+if __name__ == "__main__":
+    main()
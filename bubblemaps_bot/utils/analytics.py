@@ -0,0 +1,104 @@
+from typing import Any, Dict
+
+import numpy as np
+
+from bubblemaps_bot.utils.map_index import VersionedStore
+
+TOP_N = (10, 50, 100)
+
+holder_stats = VersionedStore("stats")
+
+
+def build_columns(map_data: dict) -> Dict[str, np.ndarray]:
+    """
+    Convert map nodes into columnar arrays, sorted by amount descending.
+    Args:
+        map_data: Map data as returned by the Bubblemaps API.
+    Returns:
+        dict: 'amount', 'percentage' and 'is_contract' arrays.
+    """
+    nodes = map_data.get("nodes", [])
+    count = len(nodes)
+    amount = np.fromiter((n.get("amount", 0) or 0 for n in nodes), float, count)
+    percentage = np.fromiter(
+        (n.get("percentage", 0) or 0 for n in nodes), float, count
+    )
+    is_contract = np.fromiter(
+        (bool(n.get("is_contract")) for n in nodes), bool, count
+    )
+
+    order = np.argsort(-amount, kind="stable")
+    return {
+        "amount": amount[order],
+        "percentage": percentage[order],
+        "is_contract": is_contract[order],
+    }
+
+
+def concentration_metrics(amount: np.ndarray, percentage: np.ndarray) -> Dict[str, Any]:
+    """
+    Compute concentration metrics over holders sorted by amount descending.
+    Args:
+        amount: Holder balances, descending.
+        percentage: Holder share of total supply in percent, same order.
+    Returns:
+        dict: Holder count, Gini, Nakamoto coefficient, HHI and top-N supply shares.
+    """
+    holders = int(amount.size)
+    total = float(amount.sum())
+    metrics: Dict[str, Any] = {"holders": holders}
+    if holders == 0 or total <= 0:
+        metrics.update({"gini": 0.0, "nakamoto": 0, "hhi": 0.0})
+        metrics.update({f"top_{n}": 0.0 for n in TOP_N})
+        return metrics
+
+    shares = amount / total
+
+    # Gini over ascending balances: (2 * sum(i * x_i)) / (n * sum(x)) - (n + 1) / n
+    ascending = amount[::-1]
+    ranks = np.arange(1, holders + 1)
+    metrics["gini"] = float(
+        2 * np.dot(ranks, ascending) / (holders * total) - (holders + 1) / holders
+    )
+    metrics["nakamoto"] = int(
+        min(np.searchsorted(np.cumsum(shares), 0.5, side="right") + 1, holders)
+    )
+    metrics["hhi"] = float(np.square(shares).sum() * 10000)
+    for n in TOP_N:
+        metrics[f"top_{n}"] = float(percentage[:n].sum())
+    return metrics
+
+
+def compute_holder_stats(map_data: dict) -> Dict[str, Dict[str, Any]]:
+    """
+    Compute concentration metrics for all mapped holders and for non-contract holders.
+    Args:
+        map_data: Map data as returned by the Bubblemaps API.
+    Returns:
+        dict: Metrics for 'all' and 'ex_contracts' holders.
+    """
+    columns = build_columns(map_data)
+    amount, percentage = columns["amount"], columns["percentage"]
+    no_contracts = ~columns["is_contract"]
+
+    return {
+        "all": concentration_metrics(amount, percentage),
+        "ex_contracts": concentration_metrics(
+            amount[no_contracts], percentage[no_contracts]
+        ),
+    }
+
+
+def get_holder_stats(token: str, chain: str, entry: dict) -> Dict[str, Dict[str, Any]]:
+    """
+    Return holder concentration metrics for a map entry, cached per map version.
+    Args:
+        token: Token address.
+        chain: Blockchain network identifier (e.g., 'eth').
+        entry: Map entry as returned by fetch_map_entry.
+    Returns:
+        dict: Metrics as returned by compute_holder_stats.
+    """
+    return holder_stats.get(
+        chain, token, entry.get("dt_update"), lambda: compute_holder_stats(entry["data"])
+    )
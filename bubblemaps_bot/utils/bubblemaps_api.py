@@ -1,7 +1,113 @@
-import httpx
+import asyncio
+import time
 
-from bubblemaps_bot import BASE_API_URL
-from bubblemaps_bot.utils.valkey import get_cache, set_cache
+from bubblemaps_bot import BASE_API_URL, MAP_DATA_MAX_AGE, VALKEY_TTL, logger
+from bubblemaps_bot.utils import http_client
+from bubblemaps_bot.utils.bubblemaps_metadata import (
+    fetch_token_metadata_update_date,
+    is_same_update,
+)
+from bubblemaps_bot.utils.clusters import find_address_cluster, get_clusters
+from bubblemaps_bot.utils.map_index import (
+    address_indexes,
+    build_address_index,
+    build_ranking,
+    rankings,
+)
+from bubblemaps_bot.utils.map_parser import MapStreamParser
+from bubblemaps_bot.utils.singleflight import single_flight
+from bubblemaps_bot.utils.snapshots import DistributionSnapshot, distribution_snapshots
+from bubblemaps_bot.utils.valkey import cache_key, get_cache, set_cache
+from bubblemaps_bot.utils.wallet_index import schedule_wallet_index
+
+ITEMS_PER_PAGE = 5
+STREAM_CHUNK_SIZE = 256 * 1024
+
+
+async def download_map_data(token: str, chain: str):
+    """
+    Download map data for a token from the Bubblemaps API, bypassing the cache.
+    The body is parsed incrementally in a worker thread as it arrives, keeping
+    only the node and link fields the bot uses.
+    Args:
+        token: Token address.
+        chain: Blockchain network identifier (e.g., 'eth').
+    Returns:
+        dict: Compacted map data if successful, None otherwise.
+    """
+    async with http_client.get(
+        BASE_API_URL, params={"token": token, "chain": chain}
+    ) as response:
+        if response.status != 200:
+            return None
+        parser = MapStreamParser()
+        async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+            await asyncio.to_thread(parser.feed, chunk)
+        return await asyncio.to_thread(parser.close)
+
+
+async def fetch_map_entry(token: str, chain: str):
+    """
+    Fetch the cached map entry for a token, downloading or revalidating it as needed.
+    Cached entries carry the map's dt_update; once older than VALKEY_TTL they are
+    revalidated against the metadata endpoint and only re-downloaded if the map
+    was recomputed upstream, or once MAP_DATA_MAX_AGE has passed since download.
+    Args:
+        token: Token address.
+        chain: Blockchain network identifier (e.g., 'eth').
+    Returns:
+        dict: Entry with 'data' and 'dt_update' if successful, None otherwise.
+    """
+    key = await cache_key("mapdata", chain, token)
+    entry = await get_cache(key)
+    if entry and "data" not in entry:
+        entry = None  # pre-revalidation format, refetch
+    if entry and time.time() - entry.get("validated_at", 0) < VALKEY_TTL:
+        return entry
+
+    async def refresh():
+        latest_update = await fetch_token_metadata_update_date(chain, token)
+        age = time.time() - entry.get("fetched_at", 0) if entry else 0
+        if (
+            entry
+            and latest_update
+            and age < MAP_DATA_MAX_AGE
+            and is_same_update(entry.get("dt_update"), latest_update)
+        ):
+            logger.info(f"[MAP CACHE] {chain}:{token} unchanged upstream, extending")
+            extended = {**entry, "validated_at": time.time()}
+            await set_cache(key, extended, ttl=max(int(MAP_DATA_MAX_AGE - age), 1))
+            return extended
+
+        data = await download_map_data(token, chain)
+        if not data:
+            # Serve the last known map rather than nothing if upstream is failing
+            return entry
+
+        dt_update = data.get("dt_update") or (
+            latest_update.isoformat() if latest_update else None
+        )
+        now = time.time()
+        fresh = {
+            "dt_update": dt_update,
+            "fetched_at": now,
+            "validated_at": now,
+            "data": data,
+            "ranking": await asyncio.to_thread(build_ranking, data, ITEMS_PER_PAGE),
+        }
+        await set_cache(key, fresh, ttl=MAP_DATA_MAX_AGE)
+        schedule_wallet_index(chain, token, fresh)
+        return fresh
+
+    started = time.time()
+    return await single_flight(
+        "map",
+        chain,
+        token,
+        refresh,
+        cache_key=key,
+        is_fresh=lambda cached: cached.get("validated_at", 0) >= started,
+    )
 
 
 async def fetch_map_data(token: str, chain: str):
@@ -13,21 +119,8 @@ async def fetch_map_data(token: str, chain: str):
     Returns:
         dict: Map data if successful, None otherwise.
     """
-    key = f"bubblemaps:{chain}:{token}"
-    cached = await get_cache(key)
-    if cached:
-        return cached
-
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            BASE_API_URL, params={"token": token, "chain": chain}
-        )
-        if response.status_code == 200:
-            data = response.json()
-            await set_cache(key, data)
-            return data
-        else:
-            return None
+    entry = await fetch_map_entry(token, chain)
+    return entry.get("data") if entry else None
 
 
 async def fetch_address_details(token: str, chain: str, address: str):
@@ -40,30 +133,125 @@ async def fetch_address_details(token: str, chain: str, address: str):
     Returns:
         dict: Address details if found, None otherwise.
     """
-    map_data = await fetch_map_data(token, chain)
-    if not map_data:
+    entry = await fetch_map_entry(token, chain)
+    if not entry:
         return None
 
-    for node in map_data.get("nodes", []):
-        if node["address"].lower() == address.lower():
-            return node
+    index = address_indexes.get(
+        chain, token, entry.get("dt_update"), lambda: build_address_index(entry["data"])
+    )
+    return index.get(address.lower())
 
-    return None
+
+async def fetch_clusters(token: str, chain: str):
+    """
+    Fetch holder clusters (wallets connected by transfers) for a token.
+    Args:
+        token: Token address.
+        chain: Blockchain network identifier (e.g., 'eth').
+    Returns:
+        dict: Clusters as returned by build_clusters, or None if data unavailable.
+    """
+    entry = await fetch_map_entry(token, chain)
+    if not entry:
+        return None
+    return get_clusters(token, chain, entry)
 
 
-async def fetch_distribution(token: str, chain: str):
+async def fetch_address_cluster(token: str, chain: str, address: str):
     """
-    Fetch and sort token holdings distribution in descending order by amount.
+    Fetch the cluster a holder address belongs to.
     Args:
         token: Token address.
         chain: Blockchain network identifier (e.g., 'eth').
+        address: Holder address.
     Returns:
-        list: Sorted list of nodes by amount in descending order, or None if data unavailable.
+        dict: The cluster, None if unavailable or the address is not clustered.
     """
-    map_data = await fetch_map_data(token, chain)
-    if not map_data:
+    result = await fetch_clusters(token, chain)
+    return find_address_cluster(result, address) if result else None
+
+
+def get_ranking(token: str, chain: str, entry: dict) -> dict:
+    """
+    Return the ranking stored with a map entry, building it for older entries.
+    Args:
+        token: Token address.
+        chain: Blockchain network identifier (e.g., 'eth').
+        entry: Map entry as returned by fetch_map_entry.
+    Returns:
+        dict: Ranking as built by build_ranking.
+    """
+    ranking = entry.get("ranking")
+    if ranking and ranking.get("page_size") == ITEMS_PER_PAGE:
+        return ranking
+    return rankings.get(
+        chain,
+        token,
+        entry.get("dt_update"),
+        lambda: build_ranking(entry["data"], ITEMS_PER_PAGE),
+    )
+
+
+async def acquire_distribution(token: str, chain: str):
+    """
+    Take a reference on the shared distribution snapshot for a token's current map.
+    Args:
+        token: Token address.
+        chain: Blockchain network identifier (e.g., 'eth').
+    Returns:
+        dict: Session handle with chain, token and map version, or None if data unavailable.
+    """
+    entry = await fetch_map_entry(token, chain)
+    if not entry or not entry["data"].get("nodes"):
         return None
 
-    nodes = map_data.get("nodes", [])
-    sorted_nodes = sorted(nodes, key=lambda x: x.get("amount", 0), reverse=True)
-    return sorted_nodes
\ No newline at end of file
+    version = entry.get("dt_update")
+
+    def build() -> DistributionSnapshot:
+        nodes = entry["data"]["nodes"]
+        ranking = get_ranking(token, chain, entry)
+        return DistributionSnapshot(
+            chain,
+            token,
+            version,
+            tuple(nodes[i] for i in ranking["order"]),
+            tuple(ranking["cumulative"]),
+            tuple(tuple(bounds) for bounds in ranking["pages"]),
+        )
+
+    distribution_snapshots.acquire(chain, token, version, build)
+    return {"chain": chain, "token": token, "version": version}
+
+
+async def resolve_distribution(handle: dict):
+    """
+    Return the snapshot a session handle points at.
+    If it was evicted, the handle is re-bound to the token's current map.
+    Args:
+        handle: Session handle from acquire_distribution (updated in place).
+    Returns:
+        DistributionSnapshot: The snapshot, or None if data unavailable.
+    """
+    chain, token = handle["chain"], handle["token"]
+    snapshot = distribution_snapshots.get(chain, token, handle["version"])
+    if snapshot is not None:
+        return snapshot
+
+    fresh = await acquire_distribution(token, chain)
+    if not fresh:
+        return None
+    handle["version"] = fresh["version"]
+    return distribution_snapshots.get(chain, token, fresh["version"])
+
+
+def release_distribution(handle: dict | None) -> None:
+    """
+    Drop a session's reference on its distribution snapshot.
+    Args:
+        handle: Session handle from acquire_distribution, or None.
+    """
+    if handle and "version" in handle:
+        distribution_snapshots.release(
+            handle["chain"], handle["token"], handle["version"]
+        )
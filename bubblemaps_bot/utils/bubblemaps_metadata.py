@@ -1,11 +1,30 @@
+import asyncio
 from datetime import datetime
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
-import aiohttp
-
-from bubblemaps_bot import MAP_METADATA_URL, SUPPORTED_CHAINS, VALKEY_TTL, logger
+from bubblemaps_bot import (
+    CHAIN_LOOKUP_CONCURRENCY,
+    CONCURRENT_CHAIN_LOOKUP,
+    FRESHNESS_TTL,
+    MAP_METADATA_URL,
+    STALE_TTL,
+    SUPPORTED_CHAINS,
+    VALKEY_TTL,
+    logger,
+)
 from bubblemaps_bot.db.tokens import add_successful_token, get_successful_token
-from bubblemaps_bot.utils.valkey import get_cache, set_cache
+from bubblemaps_bot.utils import http_client
+from bubblemaps_bot.utils.negative_cache import filter_known_misses, mark_miss
+from bubblemaps_bot.utils.singleflight import single_flight
+from bubblemaps_bot.utils.valkey import cache_key, get_cache, get_cache_swr, set_cache
+
+# Freshness oracle hits and misses, for dt_update and map availability
+freshness_stats = {
+    "update_hits": 0,
+    "update_misses": 0,
+    "availability_hits": 0,
+    "availability_misses": 0,
+}
 
 
 async def fetch_metadata_raw(chain: str, token: str) -> Optional[Dict[str, Any]]:
@@ -18,43 +37,146 @@ async def fetch_metadata_raw(chain: str, token: str) -> Optional[Dict[str, Any]]
         dict: Metadata if successful, None otherwise.
     """
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                MAP_METADATA_URL.format(chain=chain, token=token)
-            ) as resp:
-                logger.info(
-                    f"[META] Fetching metadata for {chain}:{token} — Status: {resp.status}"
+        async with http_client.get(
+            MAP_METADATA_URL.format(chain=chain, token=token)
+        ) as resp:
+            logger.info(
+                f"[META] Fetching metadata for {chain}:{token} — Status: {resp.status}"
+            )
+            if resp.status == 200:
+                data = await resp.json()
+                if data.get("status") == "OK":
+                    return data
+                logger.warning(
+                    f"[META] API returned non-OK status for {chain}:{token}"
+                )
+                await mark_miss(chain, token)
+            else:
+                logger.warning(
+                    f"[META] Failed to fetch metadata for {chain}:{token}, status: {resp.status}"
                 )
-                if resp.status == 200:
-                    data = await resp.json()
-                    if data.get("status") == "OK":
-                        return data
-                    logger.warning(
-                        f"[META] API returned non-OK status for {chain}:{token}"
-                    )
-                else:
-                    logger.warning(
-                        f"[META] Failed to fetch metadata for {chain}:{token}, status: {resp.status}"
-                    )
+                if 400 <= resp.status < 500 and resp.status != 429:
+                    await mark_miss(chain, token)
     except Exception as e:
         logger.error(f"[API ERROR] {chain}:{token} - {e}")
     return None
 
 
+def normalize_update_date(value: datetime | str) -> datetime:
+    """
+    Normalize a map update date so versions can be compared reliably.
+    Args:
+        value: Update date as a datetime or ISO 8601 string.
+    Returns:
+        datetime: Naive datetime truncated to the second.
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.replace(microsecond=0, tzinfo=None)
+
+
+def is_same_update(cached_update: Optional[str], latest_update: datetime) -> bool:
+    """
+    Check whether a cached entry was built from the latest map version.
+    Args:
+        cached_update: ISO 8601 update date stored with the cached entry.
+        latest_update: Normalized update date reported by the API.
+    Returns:
+        bool: True if the cached entry is still current.
+    """
+    if not cached_update:
+        return False
+    try:
+        return normalize_update_date(cached_update) == latest_update
+    except ValueError:
+        return False
+
+
+async def remember_update_date(chain: str, token: str, data: Dict[str, Any]) -> None:
+    """
+    Record the map update date from freshly downloaded metadata.
+    Args:
+        chain: Blockchain network identifier (e.g., 'eth').
+        token: Token address.
+        data: Metadata as returned by fetch_metadata_raw.
+    """
+    dt_update = data.get("dt_update")
+    if not dt_update:
+        return
+    key = await cache_key("freshness", chain, token)
+    await set_cache(
+        key,
+        {"dt_update": normalize_update_date(dt_update).isoformat()},
+        ttl=FRESHNESS_TTL,
+    )
+
+
+async def download_metadata(
+    chain: str, token: str, key: str
+) -> Optional[Dict[str, Any]]:
+    """
+    Download metadata and update both the metadata cache and the freshness oracle.
+    Args:
+        chain: Blockchain network identifier (e.g., 'eth').
+        token: Token address.
+        key: Metadata cache key.
+    Returns:
+        dict: Metadata if successful, None otherwise.
+    """
+    data = await fetch_metadata_raw(chain, token)
+    if data:
+        await set_cache(key, data, ttl=VALKEY_TTL, stale_ttl=STALE_TTL)
+        await remember_update_date(chain, token, data)
+    return data
+
+
+async def download_metadata_once(
+    chain: str, token: str, key: str
+) -> Optional[Dict[str, Any]]:
+    """
+    Download metadata once for every concurrent caller, in this or another process.
+    The freshness lookup and fetch_metadata share this flight, so a single
+    download feeds both the metadata cache and the freshness oracle.
+    Args:
+        chain: Blockchain network identifier (e.g., 'eth').
+        token: Token address.
+        key: Metadata cache key.
+    Returns:
+        dict: Metadata if successful, None otherwise.
+    """
+    return await single_flight(
+        "meta",
+        chain,
+        token,
+        lambda: download_metadata(chain, token, key),
+        cache_key=key,
+    )
+
+
 async def fetch_token_metadata_update_date(
     chain: str, token: str
 ) -> Optional[datetime]:
     """
     Fetch the update date from token metadata.
+    Served from a short-lived cache that every metadata download refreshes;
+    on a miss the metadata is downloaded once for all concurrent callers.
     Args:
         chain: Blockchain network identifier (e.g., 'eth').
         token: Token address.
     Returns:
-        datetime: Update date if found, None otherwise.
+        datetime: Normalized update date if found, None otherwise.
     """
-    data = await fetch_metadata_raw(chain, token)
+    freshness_key = await cache_key("freshness", chain, token)
+    cached = await get_cache(freshness_key)
+    if cached:
+        freshness_stats["update_hits"] += 1
+        return normalize_update_date(cached["dt_update"])
+
+    freshness_stats["update_misses"] += 1
+    key = await cache_key("metadata", chain, token)
+    data = await download_metadata_once(chain, token, key)
     if data and (dt_update_str := data.get("dt_update")):
-        return datetime.fromisoformat(dt_update_str)
+        return normalize_update_date(dt_update_str)
     logger.warning(f"[META] No dt_update in metadata for {chain}:{token}")
     return None
 
@@ -62,21 +184,15 @@ async def fetch_token_metadata_update_date(
 async def fetch_metadata(token: str, chain: str) -> Optional[Dict[str, Any]]:
     """
     Fetch metadata for a token, using cache if available.
+    Stale entries are served while being refreshed in the background.
     Args:
         token: Token address.
         chain: Blockchain network identifier (e.g., 'eth').
     Returns:
         dict: Metadata if successful, None otherwise.
     """
-    cache_key = f"metadata:{chain}:{token}"
-    cached = await get_cache(cache_key)
-    if cached:
-        return cached
-
-    data = await fetch_metadata_raw(chain, token)
-    if data:
-        await set_cache(cache_key, data, ttl=VALKEY_TTL)
-    return data
+    key = await cache_key("metadata", chain, token)
+    return await get_cache_swr(key, lambda: download_metadata_once(chain, token, key))
 
 
 async def fetch_metadata_from_all_chains(
@@ -102,9 +218,51 @@ async def fetch_metadata_from_all_chains(
     logger.info(
         f"[META] No successful token found in database for {token}, checking all chains"
     )
-    for chain in SUPPORTED_CHAINS:
+    chains = await filter_known_misses(token, SUPPORTED_CHAINS)
+    if CONCURRENT_CHAIN_LOOKUP:
+        result = await resolve_chains_concurrently(token, chains)
+        if result:
+            await add_successful_token(result[0], token)
+        return result
+
+    for chain in chains:
         data = await fetch_metadata(token, chain)
         if data and data.get("status") == "OK":
             await add_successful_token(chain, token)
             return chain, data
+    return None
+
+
+async def resolve_chains_concurrently(
+    token: str, chains: List[str]
+) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    Query several chains at once and return the first one that knows the token.
+    Remaining requests are cancelled as soon as a chain answers OK.
+    Args:
+        token: Token address.
+        chains: Candidate blockchain network identifiers.
+    Returns:
+        tuple: (chain, metadata) for the first successful chain, None otherwise.
+    """
+    semaphore = asyncio.Semaphore(max(1, CHAIN_LOOKUP_CONCURRENCY))
+
+    async def probe(chain: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        async with semaphore:
+            data = await fetch_metadata(token, chain)
+        if data and data.get("status") == "OK":
+            return chain, data
+        return None
+
+    tasks = [asyncio.create_task(probe(chain)) for chain in chains]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            if result:
+                logger.info(f"[META] Resolved {token} on {result[0]} concurrently")
+                return result
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
     return None
\ No newline at end of file
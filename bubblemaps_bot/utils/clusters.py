@@ -0,0 +1,108 @@
+from typing import Any, Dict, List
+
+from bubblemaps_bot.utils.map_index import VersionedStore
+
+clusters_store = VersionedStore("clusters")
+
+
+class UnionFind:
+    """Disjoint sets over node indices with path halving and union by size."""
+
+    __slots__ = ("parent", "size")
+
+    def __init__(self, count: int):
+        self.parent = list(range(count))
+        self.size = [1] * count
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a: int, b: int) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+
+
+def build_clusters(map_data: dict) -> Dict[str, Any]:
+    """
+    Group holders connected by transfer links into clusters.
+    Args:
+        map_data: Map data as returned by the Bubblemaps API.
+    Returns:
+        dict: 'clusters' (multi-wallet clusters, largest share first, each with
+        rank, members, size and percentage) and 'by_address' (lower-cased
+        address to cluster rank).
+    """
+    nodes = map_data.get("nodes", [])
+    sets = UnionFind(len(nodes))
+    for link in map_data.get("links", []):
+        source, target = link.get("source"), link.get("target")
+        if (
+            isinstance(source, int)
+            and isinstance(target, int)
+            and 0 <= source < len(nodes)
+            and 0 <= target < len(nodes)
+        ):
+            sets.union(source, target)
+
+    groups: Dict[int, List[int]] = {}
+    for index in range(len(nodes)):
+        groups.setdefault(sets.find(index), []).append(index)
+
+    clusters = []
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        members.sort(key=lambda i: nodes[i].get("amount", 0), reverse=True)
+        clusters.append(
+            {
+                "members": [nodes[i]["address"] for i in members],
+                "size": len(members),
+                "percentage": sum(nodes[i].get("percentage", 0) for i in members),
+            }
+        )
+    clusters.sort(key=lambda c: c["percentage"], reverse=True)
+
+    by_address = {}
+    for rank, cluster in enumerate(clusters, start=1):
+        cluster["rank"] = rank
+        for address in cluster["members"]:
+            by_address[address.lower()] = rank
+
+    return {"clusters": clusters, "by_address": by_address}
+
+
+def get_clusters(token: str, chain: str, entry: dict) -> Dict[str, Any]:
+    """
+    Return the clusters of a map entry, computed once per map version.
+    Args:
+        token: Token address.
+        chain: Blockchain network identifier (e.g., 'eth').
+        entry: Map entry as returned by fetch_map_entry.
+    Returns:
+        dict: Clusters as returned by build_clusters.
+    """
+    return clusters_store.get(
+        chain, token, entry.get("dt_update"), lambda: build_clusters(entry["data"])
+    )
+
+
+def find_address_cluster(result: Dict[str, Any], address: str) -> Dict[str, Any] | None:
+    """
+    Look up the cluster an address belongs to.
+    Args:
+        result: Clusters as returned by build_clusters.
+        address: Holder address.
+    Returns:
+        dict: The cluster, None if the address is not linked to other holders.
+    """
+    rank = result["by_address"].get(address.lower())
+    return result["clusters"][rank - 1] if rank else None
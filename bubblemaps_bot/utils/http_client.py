@@ -0,0 +1,130 @@
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+from urllib.parse import urlsplit
+
+import aiohttp
+from telegram.ext import Application
+
+from bubblemaps_bot import (
+    HTTP_DNS_CACHE_TTL,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_POOL_LIMIT,
+    HTTP_POOL_LIMIT_PER_HOST,
+    HTTP_TIMEOUT,
+    logger,
+)
+
+# Long-lived session shared by every upstream call (Bubblemaps, CoinGecko)
+session: aiohttp.ClientSession | None = None
+
+stats: Dict[str, Any] = {
+    "requests": 0,
+    "errors": 0,
+    "in_flight": 0,
+    "peak_in_flight": 0,
+    "per_host": defaultdict(int),
+}
+
+
+async def init_http_session() -> aiohttp.ClientSession:
+    """
+    Create the shared HTTP session with keep-alive pooling and DNS caching.
+    Returns:
+        aiohttp.ClientSession: The shared session.
+    """
+    global session
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_POOL_LIMIT,
+            limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+            ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+            use_dns_cache=True,
+            keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+        )
+        session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT),
+        )
+        logger.info(
+            f"[HTTP] Session ready (limit={HTTP_POOL_LIMIT}, per_host={HTTP_POOL_LIMIT_PER_HOST})"
+        )
+    return session
+
+
+@asynccontextmanager
+async def request(
+    method: str, url: str, **kwargs: Any
+) -> AsyncIterator[aiohttp.ClientResponse]:
+    """
+    Perform a request through the shared session, tracking pool usage.
+    Args:
+        method: HTTP method (e.g., 'GET').
+        url: Target URL.
+        **kwargs: Extra arguments forwarded to aiohttp (params, headers, ...).
+    Yields:
+        aiohttp.ClientResponse: The response, released back to the pool on exit.
+    """
+    client = await init_http_session()
+    host = urlsplit(url).netloc
+
+    stats["requests"] += 1
+    stats["per_host"][host] += 1
+    stats["in_flight"] += 1
+    stats["peak_in_flight"] = max(stats["peak_in_flight"], stats["in_flight"])
+    try:
+        async with client.request(method, url, **kwargs) as resp:
+            yield resp
+    except Exception:
+        stats["errors"] += 1
+        raise
+    finally:
+        stats["in_flight"] -= 1
+
+
+def get(url: str, **kwargs: Any):
+    """
+    Shorthand for a GET request through the shared session.
+    Args:
+        url: Target URL.
+        **kwargs: Extra arguments forwarded to aiohttp.
+    Returns:
+        Async context manager yielding the response.
+    """
+    return request("GET", url, **kwargs)
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    Report usage statistics for the shared connection pool.
+    Returns:
+        dict: Request counters, in-flight requests and idle pooled connections.
+    """
+    idle = 0
+    if session is not None and not session.closed:
+        # aiohttp does not expose idle connections publicly
+        conns = getattr(session.connector, "_conns", {})
+        idle = sum(len(c) for c in conns.values())
+
+    return {
+        "requests": stats["requests"],
+        "errors": stats["errors"],
+        "in_flight": stats["in_flight"],
+        "peak_in_flight": stats["peak_in_flight"],
+        "idle_connections": idle,
+        "limit": HTTP_POOL_LIMIT,
+        "limit_per_host": HTTP_POOL_LIMIT_PER_HOST,
+        "per_host": dict(stats["per_host"]),
+    }
+
+
+async def shutdown_http_session(_: Application) -> None:
+    """
+    Close the shared HTTP session during application shutdown.
+    Args:
+        _: Telegram Application instance (unused).
+    """
+    global session
+    if session is not None and not session.closed:
+        await session.close()
+    session = None
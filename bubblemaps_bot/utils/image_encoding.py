@@ -0,0 +1,231 @@
+import io
+import struct
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from bubblemaps_bot import (
+    IMAGE_FORMAT,
+    IMAGE_MAX_HEIGHT,
+    IMAGE_MAX_WIDTH,
+    IMAGE_OPTIMIZE,
+    IMAGE_QUALITY,
+    logger,
+)
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+FORMATS = {"png": "PNG", "webp": "WEBP", "jpeg": "JPEG"}
+EXTENSIONS = {"png": "png", "webp": "webp", "jpeg": "jpg"}
+# Transparent areas are flattened onto this colour for formats without alpha
+BACKGROUND = (255, 255, 255)
+
+
+def sniff_format(image: bytes) -> Optional[str]:
+    """
+    Detect an image format from its magic bytes.
+    Args:
+        image: Image data.
+    Returns:
+        str: 'png', 'webp' or 'jpeg', None if unknown.
+    """
+    if image[:8] == b"\x89PNG\r\n\x1a\n":
+        return "png"
+    if image[:4] == b"RIFF" and image[8:12] == b"WEBP":
+        return "webp"
+    if image[:3] == b"\xff\xd8\xff":
+        return "jpeg"
+    return None
+
+
+def image_extension(image: bytes) -> str:
+    """
+    File extension matching an image's format, used for upload filenames.
+    Args:
+        image: Image data.
+    Returns:
+        str: Extension without dot, 'png' if the format is unknown.
+    """
+    return EXTENSIONS.get(sniff_format(image), "png")
+
+
+def _jpeg_dimensions(image: bytes) -> Tuple[int, int]:
+    offset = 2
+    while offset + 9 < len(image):
+        if image[offset] != 0xFF:
+            return 0, 0
+        marker = image[offset + 1]
+        length = struct.unpack(">H", image[offset + 2 : offset + 4])[0]
+        # SOF0-SOF15, except DHT (C4), JPG (C8) and DAC (CC)
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack(">HH", image[offset + 5 : offset + 9])
+            return width, height
+        offset += 2 + length
+    return 0, 0
+
+
+def _webp_dimensions(image: bytes) -> Tuple[int, int]:
+    chunk = image[12:16]
+    if chunk == b"VP8X" and len(image) >= 30:
+        width = int.from_bytes(image[24:27], "little") + 1
+        height = int.from_bytes(image[27:30], "little") + 1
+        return width, height
+    if chunk == b"VP8 " and len(image) >= 30:
+        width, height = struct.unpack("<HH", image[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and len(image) >= 25:
+        bits = int.from_bytes(image[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    return 0, 0
+
+
+def image_dimensions(image: bytes) -> Tuple[int, int]:
+    """
+    Read width and height from a PNG, WebP or JPEG header without decoding the image.
+    Args:
+        image: Image data.
+    Returns:
+        tuple: (width, height), (0, 0) if the format is unknown.
+    """
+    fmt = sniff_format(image)
+    if fmt == "png" and len(image) >= 24:
+        return struct.unpack(">II", image[16:24])
+    if fmt == "webp":
+        return _webp_dimensions(image)
+    if fmt == "jpeg":
+        return _jpeg_dimensions(image)
+    return 0, 0
+
+
+def encode_image(
+    image: bytes,
+    fmt: str = "png",
+    quality: int = 80,
+    max_width: int = 0,
+    max_height: int = 0,
+    optimize: bool = False,
+) -> bytes:
+    """
+    Re-encode and optionally downscale a captured PNG screenshot.
+    Args:
+        image: PNG image data.
+        fmt: Target format: 'png', 'webp' or 'jpeg'.
+        quality: Quality for lossy formats, 1-100.
+        max_width: Maximum width in pixels, 0 for no limit.
+        max_height: Maximum height in pixels, 0 for no limit.
+        optimize: Spend more CPU for smaller PNG and JPEG files.
+    Returns:
+        bytes: Encoded image data, the input unchanged if there is nothing to do.
+    Raises:
+        ValueError: If the format is not supported.
+        RuntimeError: If Pillow is needed but not installed.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported image format '{fmt}'")
+
+    width, height = image_dimensions(image)
+    resize = (max_width and width > max_width) or (max_height and height > max_height)
+    if fmt == "png" and not resize and not optimize:
+        return image
+    if Image is None:
+        raise RuntimeError("Pillow is required to encode screenshots")
+
+    with Image.open(io.BytesIO(image)) as img:
+        img.load()
+        if resize:
+            img.thumbnail(
+                (max_width or img.width, max_height or img.height),
+                Image.Resampling.LANCZOS,
+            )
+        if fmt == "jpeg" and img.mode != "RGB":
+            rgba = img.convert("RGBA")
+            img = Image.new("RGB", rgba.size, BACKGROUND)
+            img.paste(rgba, mask=rgba.getchannel("A"))
+
+        options: Dict[str, Any] = {}
+        if fmt == "png":
+            options["optimize"] = optimize
+        elif fmt == "jpeg":
+            options.update(quality=quality, optimize=optimize, progressive=True)
+        else:
+            options.update(quality=quality, method=6 if optimize else 4)
+
+        out = io.BytesIO()
+        img.save(out, format=FORMATS[fmt], **options)
+
+    encoded = out.getvalue()
+    # Lossless recompression that did not help: keep the original bytes
+    if fmt == "png" and not resize and len(encoded) >= len(image):
+        return image
+    return encoded
+
+
+class EncodingStats:
+    """Bytes saved and time spent by the screenshot encoding stage."""
+
+    def __init__(self):
+        self.encoded = 0
+        self.failed = 0
+        self.raw_bytes = 0
+        self.encoded_bytes = 0
+        self.total_time = 0.0
+
+    def record(self, raw_size: int, encoded_size: int, seconds: float) -> None:
+        self.encoded += 1
+        self.raw_bytes += raw_size
+        self.encoded_bytes += encoded_size
+        self.total_time += seconds
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "format": image_format if Image else "png",
+            "quality": IMAGE_QUALITY,
+            "encoded": self.encoded,
+            "failed": self.failed,
+            "raw_bytes": self.raw_bytes,
+            "encoded_bytes": self.encoded_bytes,
+            "average_time": self.total_time / self.encoded if self.encoded else 0.0,
+        }
+
+
+encoding_stats = EncodingStats()
+
+image_format = IMAGE_FORMAT
+if image_format not in FORMATS:
+    logger.warning(f"[ENCODE] Unknown image_format '{image_format}', using png")
+    image_format = "png"
+if Image is None and (
+    image_format != "png" or IMAGE_MAX_WIDTH or IMAGE_MAX_HEIGHT or IMAGE_OPTIMIZE
+):
+    logger.warning("[ENCODE] Pillow is not installed, screenshots are kept as PNG")
+
+
+def encode_screenshot(image: bytes) -> bytes:
+    """
+    Encode a captured screenshot with the configured format, quality and size.
+    Runs synchronously; call it in a worker thread from async code.
+    Args:
+        image: PNG image data as captured by the browser.
+    Returns:
+        bytes: Encoded image data, the captured PNG if encoding is not possible.
+    """
+    if Image is None:
+        return image
+    start = time.perf_counter()
+    try:
+        encoded = encode_image(
+            image,
+            image_format,
+            IMAGE_QUALITY,
+            IMAGE_MAX_WIDTH,
+            IMAGE_MAX_HEIGHT,
+            IMAGE_OPTIMIZE,
+        )
+    except Exception as e:
+        encoding_stats.failed += 1
+        logger.error(f"[ENCODE] Failed to encode screenshot, keeping PNG: {e}")
+        return image
+    encoding_stats.record(len(image), len(encoded), time.perf_counter() - start)
+    return encoded
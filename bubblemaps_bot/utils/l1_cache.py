@@ -0,0 +1,90 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from bubblemaps_bot import L1_CACHE_ENABLED, L1_MAX_BYTES, L1_MAX_ENTRIES
+
+MISSING = object()
+
+
+class LRUCache:
+    """
+    Bounded in-process cache with LRU eviction and per-entry expiry.
+    Values are shared between callers, so only immutable values (such as
+    encoded cache frames) should be stored.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, tuple[Any, float, int]]" = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Any:
+        """
+        Look up a key, returning MISSING if absent or expired.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+
+        value, expires_at, _ = entry
+        if expires_at <= time.monotonic():
+            self.delete(key)
+            self.misses += 1
+            return MISSING
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, size: int, ttl: Optional[float]) -> None:
+        """
+        Store a value with its approximate size in bytes and TTL in seconds.
+        """
+        self.delete(key)
+        if not ttl or ttl <= 0 or size > self.max_bytes:
+            return
+
+        self.entries[key] = (value, time.monotonic() + ttl, size)
+        self.total_bytes += size
+        while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            _, (_, _, evicted_size) = self.entries.popitem(last=False)
+            self.total_bytes -= evicted_size
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry[2]
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.total_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self.entries),
+            "bytes": self.total_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+        }
+
+
+l1 = LRUCache(L1_MAX_ENTRIES, L1_MAX_BYTES) if L1_CACHE_ENABLED else None
+
+
+def get_l1_stats() -> Optional[Dict[str, int]]:
+    """
+    Report L1 cache counters.
+    Returns:
+        dict: Hit/miss/eviction counters and occupancy, None if disabled.
+    """
+    return l1.stats() if l1 else None
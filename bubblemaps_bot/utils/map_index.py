@@ -0,0 +1,107 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from bubblemaps_bot import MAP_INDEX_MAX_TOKENS
+
+
+class VersionedStore:
+    """
+    In-process store of structures derived from a token's map data.
+    Each entry is tied to the map version (dt_update) it was built from and is
+    rebuilt whenever the map changes. Bounded by token count with LRU eviction.
+    """
+
+    def __init__(self, name: str, max_tokens: int = MAP_INDEX_MAX_TOKENS):
+        self.name = name
+        self.max_tokens = max_tokens
+        self.entries: "OrderedDict[tuple[str, str], tuple[Hashable, Any]]" = (
+            OrderedDict()
+        )
+        self.builds = 0
+        self.hits = 0
+
+    def get(
+        self,
+        chain: str,
+        token: str,
+        version: Optional[str],
+        build: Callable[[], Any],
+    ) -> Any:
+        """
+        Return the structure for a map version, building it if missing or stale.
+        Args:
+            chain: Blockchain network identifier (e.g., 'eth').
+            token: Token address.
+            version: Map dt_update; None always rebuilds.
+            build: Function building the structure from the map data.
+        Returns:
+            The derived structure.
+        """
+        key = (chain, token.lower())
+        entry = self.entries.get(key)
+        if entry is not None and version is not None and entry[0] == version:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        value = build()
+        self.builds += 1
+        self.entries[key] = (version, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_tokens:
+            self.entries.popitem(last=False)
+        return value
+
+    def discard(self, chain: str, token: str) -> None:
+        self.entries.pop((chain, token.lower()), None)
+
+    def stats(self) -> Dict[str, int]:
+        return {"builds": self.builds, "hits": self.hits, "tokens": len(self.entries)}
+
+
+address_indexes = VersionedStore("address")
+rankings = VersionedStore("ranking")
+
+
+def build_address_index(map_data: dict) -> Dict[str, dict]:
+    """
+    Index map nodes by lower-cased address.
+    Args:
+        map_data: Map data as returned by the Bubblemaps API.
+    Returns:
+        dict: Address to node mapping.
+    """
+    return {node["address"].lower(): node for node in map_data.get("nodes", [])}
+
+
+def build_ranking(map_data: dict, page_size: int) -> Dict[str, Any]:
+    """
+    Rank map nodes by amount once so pages can be served by slicing.
+    Args:
+        map_data: Map data as returned by the Bubblemaps API.
+        page_size: Number of holders per page.
+    Returns:
+        dict: Node indices in rank order, cumulative percentage at each rank,
+        and (start, end) bounds of every page.
+    """
+    nodes = map_data.get("nodes", [])
+    order = sorted(
+        range(len(nodes)), key=lambda i: nodes[i].get("amount", 0), reverse=True
+    )
+
+    cumulative = []
+    running = 0.0
+    for i in order:
+        running += nodes[i].get("percentage", 0)
+        cumulative.append(round(running, 6))
+
+    pages = [
+        [start, min(start + page_size, len(order))]
+        for start in range(0, len(order), page_size)
+    ]
+    return {
+        "order": order,
+        "cumulative": cumulative,
+        "page_size": page_size,
+        "pages": pages,
+    }
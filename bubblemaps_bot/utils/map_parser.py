@@ -0,0 +1,118 @@
+import json
+from typing import Any, Dict, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Only the fields the bot reads are kept; everything else is dropped on ingest
+NODE_FIELDS = (
+    "address",
+    "amount",
+    "percentage",
+    "name",
+    "is_contract",
+    "transaction_count",
+    "transfer_count",
+)
+LINK_FIELDS = ("source", "target", "forward", "backward")
+
+
+def compact_node(node: Dict[str, Any]) -> Dict[str, Any]:
+    return {field: node[field] for field in NODE_FIELDS if field in node}
+
+
+def compact_link(link: Dict[str, Any]) -> Dict[str, Any]:
+    return {field: link[field] for field in LINK_FIELDS if field in link}
+
+
+def compact_map_data(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduce a fully parsed map payload to top-level scalars, nodes and links.
+    Args:
+        data: Map data as returned by the Bubblemaps API.
+    Returns:
+        dict: Compacted map data.
+    """
+    compact = {
+        key: value
+        for key, value in data.items()
+        if not isinstance(value, (dict, list))
+    }
+    compact["nodes"] = [compact_node(node) for node in data.get("nodes", [])]
+    compact["links"] = [compact_link(link) for link in data.get("links", [])]
+    return compact
+
+
+class MapStreamParser:
+    """
+    Incremental parser for map-data responses.
+    With ijson installed, nodes and links are parsed and compacted as chunks
+    arrive, so the full document tree is never held in memory. Otherwise the
+    body is buffered and parsed in one go. feed() and close() do the CPU work
+    and are meant to be run in a worker thread.
+    """
+
+    def __init__(self):
+        self.result: Dict[str, Any] = {"nodes": [], "links": []}
+        self.buffer: Optional[bytearray] = None
+        self.builder = None
+        self.builder_prefix: Optional[str] = None
+        if ijson:
+            sink = self._sink()
+            next(sink)
+            self.coro = ijson.parse_coro(sink, use_float=True)
+        else:
+            self.coro = None
+            self.buffer = bytearray()
+
+    def _sink(self):
+        while True:
+            prefix, event, value = yield
+            if self.builder is not None:
+                self.builder.event(event, value)
+                if prefix == self.builder_prefix and event == "end_map":
+                    self._emit(self.builder_prefix, self.builder.value)
+                    self.builder = None
+            elif prefix in ("nodes.item", "links.item") and event == "start_map":
+                self.builder = ijson.ObjectBuilder()
+                self.builder_prefix = prefix
+                self.builder.event(event, value)
+            elif "." not in prefix and event in (
+                "string",
+                "number",
+                "boolean",
+                "null",
+            ):
+                self.result[prefix] = value
+
+    def _emit(self, prefix: str, item: Dict[str, Any]) -> None:
+        if prefix == "nodes.item":
+            self.result["nodes"].append(compact_node(item))
+        else:
+            self.result["links"].append(compact_link(item))
+
+    def feed(self, chunk: bytes) -> None:
+        if self.coro is not None:
+            self.coro.send(chunk)
+        else:
+            self.buffer.extend(chunk)
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Finish parsing.
+        Returns:
+            dict: Compacted map data.
+        """
+        if self.coro is not None:
+            self.coro.close()
+            return self.result
+        raw = bytes(self.buffer)
+        self.buffer = None
+        return compact_map_data(orjson.loads(raw) if orjson else json.loads(raw))
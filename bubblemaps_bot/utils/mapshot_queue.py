@@ -0,0 +1,270 @@
+import asyncio
+import os
+import socket
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from telegram import Bot
+from telegram.ext import Application
+
+from bubblemaps_bot import MAPSHOT_QUEUE_CONCURRENCY, MAPSHOT_QUEUE_MAX_DEPTH, logger
+from bubblemaps_bot.db.mapshot_jobs import (
+    claim_next_mapshot_job,
+    complete_mapshot_job,
+    count_mapshot_jobs,
+    enqueue_mapshot_job,
+    requeue_running_mapshot_jobs,
+    touch_mapshot_jobs,
+    utcnow,
+)
+from bubblemaps_bot.models.mapshot_jobs import MapshotJob, MapshotWaiter
+from bubblemaps_bot.utils.bubblemaps_metadata import fetch_token_metadata_update_date
+from bubblemaps_bot.utils.popularity import token_popularity
+from bubblemaps_bot.utils.screenshot import (
+    capture_bubblemap_version,
+    lookup_screenshot,
+)
+
+# Lower runs first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+# Running jobs report a heartbeat this often; jobs of an instance silent for
+# HEARTBEAT_STALE seconds are taken over by the others
+HEARTBEAT_INTERVAL = 15
+HEARTBEAT_STALE = 60
+
+# deliver(bot, waiter, chain, token, screenshot or None on failure, map update date)
+Deliver = Callable[
+    [Bot, MapshotWaiter, str, str, Optional[bytes], Optional[datetime]],
+    Awaitable[None],
+]
+
+
+class QueueFull(Exception):
+    """Raised when a new mapshot job is refused because the queue is full."""
+
+
+class MapshotQueue:
+    """
+    Database-backed mapshot job queue.
+    Jobs are deduplicated by (chain, token, map version), so one render is
+    delivered to every chat waiting for it. Interactive jobs run before
+    background ones, new jobs are refused once max_depth jobs are queued, and
+    queued jobs and their waiting chats survive restarts.
+    """
+
+    def __init__(self, concurrency: int, max_depth: int):
+        self.concurrency = max(1, concurrency)
+        self.max_depth = max_depth
+        self.deliverers: Dict[str, Deliver] = {}
+        self.wakeup = asyncio.Event()
+        self.tasks: List[asyncio.Task] = []
+        self.bot: Optional[Bot] = None
+        # Identifies this instance's running jobs to the others
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.running = 0
+        # Job IDs submitted from this process and not finished yet
+        self.pending: set[int] = set()
+        self.counters = {
+            "stored": 0,
+            "submitted": 0,
+            "deduplicated": 0,
+            "rejected": 0,
+            "completed": 0,
+            "failed": 0,
+        }
+        self.waits = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def register(self, kind: str, deliver: Deliver) -> None:
+        """
+        Register how results are delivered to waiters of a kind.
+        Args:
+            kind: Waiter kind, stored with each waiter.
+            deliver: Coroutine function sending the result to the waiter's chat.
+        """
+        self.deliverers[kind] = deliver
+
+    async def submit(
+        self,
+        chain: str,
+        token: str,
+        priority: int = PRIORITY_INTERACTIVE,
+        waiter: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        """
+        Queue a mapshot, joining a pending job for the same map version if any.
+        Args:
+            chain: Blockchain network identifier (e.g., 'eth').
+            token: Token address.
+            priority: PRIORITY_INTERACTIVE or PRIORITY_BACKGROUND.
+            waiter: Chat to deliver the result to: kind, chat_id, message_id,
+                reply_to_message_id and is_group. None for background renders.
+        Returns:
+            int: Job ID.
+        Raises:
+            QueueFull: If the queue is full and no pending job could be joined.
+        """
+        latest_update = await fetch_token_metadata_update_date(chain, token)
+        version = latest_update.isoformat() if latest_update else None
+        job_id, created = await enqueue_mapshot_job(
+            chain, token, version, priority, waiter, self.max_depth
+        )
+        if job_id is None:
+            self.counters["rejected"] += 1
+            raise QueueFull(f"Mapshot queue is full ({self.max_depth} jobs)")
+
+        self.counters["submitted" if created else "deduplicated"] += 1
+        self.pending.add(job_id)
+        if priority == PRIORITY_INTERACTIVE:
+            token_popularity.record(chain, token)
+        self.wakeup.set()
+        return job_id
+
+    async def request(
+        self, chain: str, token: str, waiter: Dict[str, Any]
+    ) -> Optional[int]:
+        """
+        Answer an interactive mapshot request, rendering only if needed.
+        A stored screenshot of the current map version is delivered right away;
+        otherwise the mapshot is queued.
+        Args:
+            chain: Blockchain network identifier (e.g., 'eth').
+            token: Token address.
+            waiter: Chat to deliver the result to, as for submit.
+        Returns:
+            int: Job ID, None if a stored screenshot was delivered.
+        Raises:
+            QueueFull: If a render is needed and the queue is full.
+        """
+        stored = await lookup_screenshot(chain, token)
+        if stored is None:
+            return await self.submit(chain, token, PRIORITY_INTERACTIVE, waiter)
+
+        self.counters["stored"] += 1
+        token_popularity.record(chain, token)
+        screenshot, update_date = stored
+        deliver = self.deliverers[waiter["kind"]]
+        await deliver(
+            self.bot, MapshotWaiter(**waiter), chain, token, screenshot, update_date
+        )
+        return None
+
+    async def start(self, bot: Bot) -> None:
+        """
+        Requeue jobs of instances that went away and start the dispatchers.
+        Args:
+            bot: Bot used to deliver results.
+        """
+        self.bot = bot
+        await self._requeue_stale()
+        self.tasks = [
+            asyncio.create_task(self._dispatch()) for _ in range(self.concurrency)
+        ]
+        self.tasks.append(asyncio.create_task(self._heartbeat()))
+
+    async def _requeue_stale(self) -> None:
+        requeued = await requeue_running_mapshot_jobs(HEARTBEAT_STALE)
+        if requeued:
+            logger.info(f"[MAPSHOT QUEUE] Requeued {requeued} interrupted jobs")
+            self.wakeup.set()
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            try:
+                await touch_mapshot_jobs(self.owner)
+                await self._requeue_stale()
+            except Exception as e:
+                logger.error(f"[MAPSHOT QUEUE] Heartbeat failed: {e}")
+
+    async def stop(self) -> None:
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    async def _next_job(self) -> MapshotJob:
+        while True:
+            job = await claim_next_mapshot_job(self.owner)
+            if job is not None:
+                return job
+            self.wakeup.clear()
+            # A job submitted before clear() would otherwise wait for the next one
+            job = await claim_next_mapshot_job(self.owner)
+            if job is not None:
+                return job
+            await self.wakeup.wait()
+
+    async def _dispatch(self) -> None:
+        while True:
+            try:
+                job = await self._next_job()
+                await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[MAPSHOT QUEUE] Dispatcher error: {e}")
+                await asyncio.sleep(1)
+
+    async def _run(self, job: MapshotJob) -> None:
+        wait = max((utcnow() - job.created_at).total_seconds(), 0)
+        self.waits += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+        screenshot, update_date = None, None
+        self.running += 1
+        try:
+            screenshot, update_date = await capture_bubblemap_version(
+                job.chain, job.token_id
+            )
+            self.counters["completed"] += 1
+        except Exception as e:
+            self.counters["failed"] += 1
+            logger.error(
+                f"[MAPSHOT QUEUE] Job {job.id} for {job.chain}:{job.token_id} failed: {e}"
+            )
+        finally:
+            self.running -= 1
+
+        self.pending.discard(job.id)
+        for waiter in await complete_mapshot_job(job.id):
+            deliver = self.deliverers.get(waiter.kind)
+            if deliver is None:
+                logger.warning(f"[MAPSHOT QUEUE] No deliverer for {waiter.kind}")
+                continue
+            try:
+                await deliver(
+                    self.bot, waiter, job.chain, job.token_id, screenshot, update_date
+                )
+            except Exception as e:
+                logger.error(
+                    f"[MAPSHOT QUEUE] Delivery to chat {waiter.chat_id} failed: {e}"
+                )
+
+    async def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            "depth": await count_mapshot_jobs(),
+            "running": self.running,
+            "concurrency": self.concurrency,
+            "max_depth": self.max_depth,
+            "average_wait": self.total_wait / self.waits if self.waits else 0.0,
+            "max_wait": self.max_wait,
+        }
+
+
+mapshot_queue = MapshotQueue(MAPSHOT_QUEUE_CONCURRENCY, MAPSHOT_QUEUE_MAX_DEPTH)
+
+
+async def shutdown_mapshot_queue(_: Application) -> None:
+    """
+    Stop dispatching during application shutdown; queued jobs stay in the database.
+    Args:
+        _: Telegram Application instance (unused).
+    """
+    await mapshot_queue.stop()
@@ -0,0 +1,92 @@
+import time
+from typing import Dict, List
+
+from bubblemaps_bot import NEGATIVE_CACHE_TTL, logger
+from bubblemaps_bot.utils.valkey import cache_key, local_stores, valkey
+
+# In-process fallback keyed by cache key, also consulted first to save a
+# Valkey round trip
+local_misses: Dict[str, float] = {}
+local_stores.append(local_misses)
+MAX_LOCAL_ENTRIES = 10000
+
+stats = {"hits": 0, "misses_recorded": 0}
+
+
+def _prune_local() -> None:
+    now = time.monotonic()
+    for entry, expiry in list(local_misses.items()):
+        if expiry <= now:
+            del local_misses[entry]
+    # Still full of live entries: drop the ones closest to expiry
+    if len(local_misses) >= MAX_LOCAL_ENTRIES:
+        for entry, _ in sorted(local_misses.items(), key=lambda x: x[1])[
+            : len(local_misses) // 2
+        ]:
+            del local_misses[entry]
+
+
+async def mark_miss(chain: str, token: str) -> None:
+    """
+    Record that a token is not indexed on a chain.
+    Args:
+        chain: Blockchain network identifier (e.g., 'eth').
+        token: Token address.
+    """
+    if NEGATIVE_CACHE_TTL <= 0:
+        return
+
+    key = await cache_key("negative", chain, token)
+    if len(local_misses) >= MAX_LOCAL_ENTRIES:
+        _prune_local()
+    local_misses[key] = time.monotonic() + NEGATIVE_CACHE_TTL
+    stats["misses_recorded"] += 1
+
+    if valkey:
+        try:
+            await valkey.set(key, "1", ex=NEGATIVE_CACHE_TTL)
+        except Exception as e:
+            logger.error(f"Error setting negative cache for {chain}:{token}: {e}")
+
+
+async def filter_known_misses(token: str, chains: List[str]) -> List[str]:
+    """
+    Drop chains on which the token is a known miss.
+    Args:
+        token: Token address.
+        chains: Candidate blockchain network identifiers.
+    Returns:
+        list: Chains that still need to be queried, in the original order.
+    """
+    if NEGATIVE_CACHE_TTL <= 0 or not chains:
+        return list(chains)
+
+    keys = {chain: await cache_key("negative", chain, token) for chain in chains}
+    now = time.monotonic()
+    known = {chain for chain in chains if local_misses.get(keys[chain], 0) > now}
+
+    unknown = [chain for chain in chains if chain not in known]
+    if valkey and unknown:
+        try:
+            flags = await valkey.mget([keys[chain] for chain in unknown])
+            known.update(chain for chain, flag in zip(unknown, flags) if flag)
+        except Exception as e:
+            logger.error(f"Error reading negative cache for {token}: {e}")
+
+    if known:
+        stats["hits"] += len(known)
+        logger.info(f"[NEGATIVE CACHE] Skipping {sorted(known)} for {token}")
+    return [chain for chain in chains if chain not in known]
+
+
+def get_negative_cache_stats() -> Dict[str, int]:
+    """
+    Report negative cache counters.
+    Returns:
+        dict: Upstream calls saved, misses recorded and local entry count.
+    """
+    return {
+        "hits": stats["hits"],
+        "misses_recorded": stats["misses_recorded"],
+        "local_entries": len(local_misses),
+    }
@@ -0,0 +1,186 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from playwright.async_api import Browser, BrowserContext, Page
+
+from bubblemaps_bot import logger
+
+DEFAULT_VIEWPORT = {"width": 1200, "height": 800}
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+)
+
+
+class PageSlot:
+    """A browser context with one page, reused across renders."""
+
+    __slots__ = ("browser", "context", "page", "renders")
+
+    def __init__(self, browser: Browser, context: BrowserContext, page: Page):
+        self.browser = browser
+        self.context = context
+        self.page = page
+        self.renders = 0
+
+    def usable(self, browser: Browser) -> bool:
+        return (
+            self.browser is browser
+            and browser.is_connected()
+            and not self.page.is_closed()
+        )
+
+
+class PagePool:
+    """
+    Fixed-size pool of pre-warmed browser contexts and pages.
+    The pool size also bounds how many renders run at once. Pages are reset to
+    about:blank with cleared cookies between renders, and recycled after
+    max_renders uses or once their JS heap exceeds max_heap_mb.
+    """
+
+    def __init__(self, size: int, max_renders: int, max_heap_mb: int):
+        self.size = size
+        self.max_renders = max_renders
+        self.max_heap_bytes = max_heap_mb * 1024 * 1024
+        self.idle: List[PageSlot] = []
+        self.slots = asyncio.Semaphore(size)
+        self.in_use = 0
+        # Set while no page is borrowed
+        self.drained = asyncio.Event()
+        self.drained.set()
+        self.created = 0
+        self.recycled = 0
+        self.renders = 0
+
+    async def _create(self, browser: Browser) -> PageSlot:
+        context = await browser.new_context(
+            viewport=DEFAULT_VIEWPORT,
+            user_agent=DEFAULT_USER_AGENT,
+            java_script_enabled=True,
+        )
+        page = await context.new_page()
+        self.created += 1
+        return PageSlot(browser, context, page)
+
+    @staticmethod
+    async def _close(slot: PageSlot) -> None:
+        try:
+            await slot.context.close()
+        except Exception as e:
+            logger.debug(f"[PAGE POOL] Error closing context: {e}")
+
+    async def warm(self, browser: Browser) -> None:
+        """
+        Create idle slots up to the pool size.
+        Args:
+            browser: Connected browser to create contexts in.
+        """
+        while len(self.idle) + self.in_use < self.size:
+            self.idle.append(await self._create(browser))
+        logger.info(f"[PAGE POOL] Warmed {len(self.idle)} pages")
+
+    async def _heap_bytes(self, page: Page) -> int:
+        try:
+            return await page.evaluate(
+                "() => (performance.memory && performance.memory.usedJSHeapSize) || 0"
+            )
+        except Exception:
+            return 0
+
+    async def _should_recycle(self, slot: PageSlot) -> bool:
+        if slot.renders >= self.max_renders:
+            return True
+        return await self._heap_bytes(slot.page) > self.max_heap_bytes
+
+    async def _reset(self, slot: PageSlot) -> bool:
+        try:
+            await slot.page.goto("about:blank")
+            await slot.context.clear_cookies()
+            return True
+        except Exception as e:
+            logger.warning(f"[PAGE POOL] Page reset failed, recycling: {e}")
+            return False
+
+    async def _release(self, slot: PageSlot, failed: bool) -> None:
+        slot.renders += 1
+        self.renders += 1
+        if (
+            failed
+            or await self._should_recycle(slot)
+            or not await self._reset(slot)
+        ):
+            self.recycled += 1
+            await self._close(slot)
+            return
+        self.idle.append(slot)
+
+    @asynccontextmanager
+    async def page(self, browser: Browser) -> AsyncIterator[Page]:
+        """
+        Borrow a ready page, waiting if every slot is busy.
+        Args:
+            browser: Connected browser; slots from a previous browser are replaced.
+        Yields:
+            Page: A page on about:blank with the pool's viewport and user agent.
+        """
+        async with self.slots:
+            slot: Optional[PageSlot] = None
+            while self.idle and slot is None:
+                candidate = self.idle.pop()
+                if candidate.usable(browser):
+                    slot = candidate
+                else:
+                    await self._close(candidate)
+            if slot is None:
+                slot = await self._create(browser)
+
+            self.in_use += 1
+            self.drained.clear()
+            failed = False
+            try:
+                yield slot.page
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                self.in_use -= 1
+                try:
+                    await self._release(slot, failed)
+                finally:
+                    if not self.in_use:
+                        self.drained.set()
+
+    async def drain(self, timeout: float) -> bool:
+        """
+        Wait until every borrowed page has been returned.
+        Args:
+            timeout: Maximum seconds to wait.
+        Returns:
+            bool: True if no page is in use anymore, False on timeout.
+        """
+        try:
+            await asyncio.wait_for(self.drained.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def close(self) -> None:
+        """
+        Close every idle slot.
+        """
+        idle, self.idle = self.idle, []
+        for slot in idle:
+            await self._close(slot)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "idle": len(self.idle),
+            "in_use": self.in_use,
+            "created": self.created,
+            "recycled": self.recycled,
+            "renders": self.renders,
+        }
+
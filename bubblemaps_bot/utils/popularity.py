@@ -0,0 +1,60 @@
+import math
+import time
+from typing import Dict, List, Tuple
+
+from bubblemaps_bot import MAP_INDEX_MAX_TOKENS
+
+# Request counts lose half their weight every 6 hours
+HALF_LIFE = 6 * 3600
+
+
+class TokenPopularity:
+    """
+    Exponentially decaying request counts per token, bounded by token count.
+    """
+
+    def __init__(self, max_tokens: int, half_life: float = HALF_LIFE):
+        self.max_tokens = max_tokens
+        self.decay = math.log(2) / half_life
+        self.scores: Dict[Tuple[str, str], Tuple[float, float]] = {}
+
+    def _score(self, entry: Tuple[float, float], now: float) -> float:
+        score, updated = entry
+        return score * math.exp(-self.decay * (now - updated))
+
+    def record(self, chain: str, token: str) -> None:
+        """
+        Count one user request for a token.
+        Args:
+            chain: Blockchain network identifier (e.g., 'eth').
+            token: Token address.
+        """
+        now = time.time()
+        key = (chain, token)
+        entry = self.scores.get(key)
+        self.scores[key] = ((self._score(entry, now) if entry else 0.0) + 1, now)
+        if len(self.scores) > self.max_tokens:
+            coldest = min(self.scores, key=lambda k: self._score(self.scores[k], now))
+            del self.scores[coldest]
+
+    def top(self, limit: int) -> List[Tuple[str, str, float]]:
+        """
+        Return the most requested tokens.
+        Args:
+            limit: Maximum number of tokens.
+        Returns:
+            list: (chain, token, score) tuples, most popular first.
+        """
+        now = time.time()
+        ranked = sorted(
+            (
+                (chain, token, self._score(entry, now))
+                for (chain, token), entry in self.scores.items()
+            ),
+            key=lambda item: item[2],
+            reverse=True,
+        )
+        return ranked[:limit]
+
+
+token_popularity = TokenPopularity(MAP_INDEX_MAX_TOKENS)
@@ -0,0 +1,154 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from telegram.ext import Application
+
+from bubblemaps_bot import (
+    PRERENDER_CONCURRENCY,
+    PRERENDER_ENABLED,
+    PRERENDER_INTERVAL,
+    PRERENDER_PER_HOUR,
+    PRERENDER_TOKENS,
+    logger,
+)
+from bubblemaps_bot.db.screenshot import get_token_screenshot_update_date
+from bubblemaps_bot.db.tokens import get_recent_successful_tokens
+from bubblemaps_bot.utils.bubblemaps_metadata import (
+    fetch_token_metadata_update_date,
+    normalize_update_date,
+)
+from bubblemaps_bot.utils.mapshot_queue import (
+    PRIORITY_BACKGROUND,
+    QueueFull,
+    mapshot_queue,
+)
+from bubblemaps_bot.utils.popularity import token_popularity
+
+
+class PrerenderScheduler:
+    """
+    Periodically re-renders the bubblemaps of popular tokens whose map changed.
+    Hot tokens are the most requested ones, topped up with recently resolved
+    tokens from the database. Renders go through the mapshot queue at
+    background priority, only while render slots are free, and within an
+    hourly budget and a cap on concurrent pre-renders.
+    """
+
+    def __init__(self, interval: int, tokens: int, per_hour: int, concurrency: int):
+        self.interval = interval
+        self.tokens = tokens
+        self.per_hour = per_hour
+        self.concurrency = concurrency
+        self.submitted: deque[float] = deque()
+        self.jobs: set[int] = set()
+        self.task: Optional[asyncio.Task] = None
+        self.counters = {"cycles": 0, "checked": 0, "rendered": 0, "deferred": 0}
+
+    async def hot_tokens(self) -> List[Tuple[str, str]]:
+        """
+        Return the tokens worth keeping pre-rendered, most popular first.
+        Returns:
+            list: (chain, token) tuples.
+        """
+        hot = [(chain, token) for chain, token, _ in token_popularity.top(self.tokens)]
+        if len(hot) < self.tokens:
+            seen = {(chain, token.lower()) for chain, token in hot}
+            for row in await get_recent_successful_tokens(self.tokens):
+                if len(hot) >= self.tokens:
+                    break
+                if (row.chain, row.token_id.lower()) not in seen:
+                    seen.add((row.chain, row.token_id.lower()))
+                    hot.append((row.chain, row.token_id))
+        return hot
+
+    def budget_left(self) -> int:
+        cutoff = time.time() - 3600
+        while self.submitted and self.submitted[0] < cutoff:
+            self.submitted.popleft()
+        return self.per_hour - len(self.submitted)
+
+    def slots_left(self) -> int:
+        self.jobs &= mapshot_queue.pending
+        idle = mapshot_queue.concurrency - mapshot_queue.running
+        return min(self.concurrency - len(self.jobs), idle)
+
+    async def is_stale(self, chain: str, token: str) -> bool:
+        latest_update = await fetch_token_metadata_update_date(chain, token)
+        if not latest_update:
+            return False
+        rendered = await get_token_screenshot_update_date(chain, token)
+        return rendered is None or normalize_update_date(rendered) != latest_update
+
+    async def run_once(self) -> None:
+        """
+        Check every hot token once and queue renders for changed maps.
+        """
+        self.counters["cycles"] += 1
+        for chain, token in await self.hot_tokens():
+            if self.budget_left() <= 0 or self.slots_left() <= 0:
+                self.counters["deferred"] += 1
+                break
+            self.counters["checked"] += 1
+            if not await self.is_stale(chain, token):
+                continue
+            try:
+                job_id = await mapshot_queue.submit(
+                    chain, token, priority=PRIORITY_BACKGROUND
+                )
+            except QueueFull:
+                break
+            self.jobs.add(job_id)
+            self.submitted.append(time.time())
+            self.counters["rendered"] += 1
+            logger.info(f"[PRERENDER] Queued {chain}:{token}")
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"[PRERENDER] Cycle failed: {e}")
+
+    def start(self) -> None:
+        if self.task is None:
+            self.task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            "enabled": self.task is not None,
+            "in_flight": len(self.jobs & mapshot_queue.pending),
+            "budget_left": self.budget_left(),
+            "per_hour": self.per_hour,
+        }
+
+
+prerender_scheduler = PrerenderScheduler(
+    PRERENDER_INTERVAL, PRERENDER_TOKENS, PRERENDER_PER_HOUR, PRERENDER_CONCURRENCY
+)
+
+
+def init_prerender() -> None:
+    """
+    Start background pre-rendering if enabled.
+    """
+    if PRERENDER_ENABLED:
+        prerender_scheduler.start()
+
+
+async def shutdown_prerender(_: Application) -> None:
+    """
+    Stop background pre-rendering during application shutdown.
+    Args:
+        _: Telegram Application instance (unused).
+    """
+    await prerender_scheduler.stop()
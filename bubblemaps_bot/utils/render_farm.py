@@ -0,0 +1,510 @@
+import asyncio
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from playwright.async_api import (
+    Browser,
+    ElementHandle,
+    Page,
+    Playwright,
+    async_playwright,
+)
+from telegram.ext import Application
+
+from bubblemaps_bot import (
+    BROWSER_PAGE_MAX_HEAP_MB,
+    BROWSER_PAGE_MAX_RENDERS,
+    BROWSER_POOL_SIZE,
+    BROWSER_RENDER_READINESS,
+    BROWSER_RENDER_TIMEOUT,
+    RENDER_FARM_MODE,
+    RENDER_HEALTH_INTERVAL,
+    RENDER_JOB_TIMEOUT,
+    RENDER_WORKER_MAX_FAILURES,
+    RENDER_WORKERS,
+    VALKEY_KEY_PREFIX,
+    logger,
+)
+from bubblemaps_bot.utils.page_pool import PagePool
+from bubblemaps_bot.utils.render_readiness import render_times, wait_for_render
+from bubblemaps_bot.utils.valkey import decode_value, encode_value, valkey
+
+CHROMIUM_ARGS = [
+    "--no-sandbox",
+    "--disable-setuid-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-accelerated-2d-canvas",
+    "--no-first-run",
+    "--no-zygote",
+    "--disable-gpu",
+]
+
+# Remote mode: jobs are codec frames on a Valkey list; each reply is pushed to a
+# per-job list as b"OK" + PNG bytes or b"ER" + error message.
+RENDER_QUEUE_KEY = f"{VALKEY_KEY_PREFIX}:render:queue"
+RESULT_TTL = 60
+# A job is retried once on another browser if its browser crashed mid-render
+MAX_ATTEMPTS = 2
+
+
+def result_key(job_id: str) -> str:
+    return f"{VALKEY_KEY_PREFIX}:render:result:{job_id}"
+
+
+async def close_overlays(page: Page, settle: float = 0, wait: float = 0) -> None:
+    """
+    Dismiss the welcome popup and remove the fundraising banner.
+    Args:
+        page: Page showing a Bubblemap.
+        settle: Seconds to wait after closing the popup.
+        wait: Seconds to wait at most for a clicked popup to be removed or hidden.
+    """
+    try:
+        clicked = await page.evaluate(
+            """
+            () => {
+                let clicked = false;
+                const elements = Array.from(document.querySelectorAll("*"));
+                for (const el of elements) {
+                    if (el.innerText && el.innerText.trim() === 'CLOSE') {
+                        el.click();
+                        clicked = true;
+                    }
+                }
+                return clicked;
+            }
+            """
+        )
+        if clicked and wait:
+            # The popup fades out; a screenshot taken meanwhile still shows it
+            await page.wait_for_function(
+                """
+                () => !Array.from(document.querySelectorAll("*")).some(
+                    (el) => el.innerText && el.innerText.trim() === 'CLOSE'
+                        && el.getClientRects().length > 0
+                )
+                """,
+                polling=100,
+                timeout=wait * 1000,
+            )
+        if settle:
+            await asyncio.sleep(settle)
+    except Exception as e:
+        logger.warning(f"Failed to close popup: {e}")
+
+    await page.evaluate(
+        """
+        () => {
+            const banner = document.querySelector('div.fundraising-banner.--desktop');
+            if (banner) banner.remove();
+
+            const header = document.querySelector('header.mdc-top-app-bar.mdc-top-app-bar--fixed');
+            if (header) header.style.display = 'flex';
+        }
+        """
+    )
+
+
+async def reveal_svg(svg_element: ElementHandle) -> None:
+    await svg_element.evaluate(
+        """
+        (svg) => {
+            svg.style.visibility = 'visible';
+            svg.style.opacity = '1';
+        }
+        """
+    )
+
+
+async def render_page(page: Page, url: str, delay: int) -> Tuple[bytes, str]:
+    """
+    Load a Bubblemap in a page and screenshot its SVG once drawn.
+    Args:
+        page: Pooled page on about:blank.
+        url: Bubblemap iframe URL.
+        delay: Fixed delay in seconds used when readiness detection is off or fails.
+    Returns:
+        tuple: (PNG image data, how readiness was decided).
+    Raises:
+        Exception: If the map SVG cannot be found or captured.
+    """
+    await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+
+    if BROWSER_RENDER_READINESS:
+        svg_element = await page.wait_for_selector(
+            "#svg", state="attached", timeout=BROWSER_RENDER_TIMEOUT * 1000
+        )
+        await reveal_svg(svg_element)
+        try:
+            _, outcome = await wait_for_render(page, svg_element)
+        except Exception as e:
+            logger.warning(f"Readiness detection failed, sleeping: {e}")
+            await asyncio.sleep(delay)
+            outcome = "fallback"
+        await close_overlays(page, wait=2)
+    else:
+        await asyncio.sleep(5)
+        await close_overlays(page, settle=2)
+        svg_element = await page.query_selector("#svg")
+        if not svg_element:
+            raise Exception("SVG element with id='svg' not found")
+        await reveal_svg(svg_element)
+        await asyncio.sleep(delay)
+        outcome = "fixed"
+
+    bounding_box = await svg_element.bounding_box()
+    if not bounding_box:
+        raise Exception("SVG bounding box not available")
+
+    return await svg_element.screenshot(type="png"), outcome
+
+
+class RenderJob:
+    __slots__ = ("chain", "token", "url", "delay", "future", "attempts")
+
+    def __init__(self, chain: str, token: str, url: str, delay: int):
+        self.chain = chain
+        self.token = token
+        self.url = url
+        self.delay = delay
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.attempts = 0
+
+
+class RenderWorker:
+    """
+    One Chromium process with its own page pool, fed from the farm's queue.
+    The browser is relaunched when it disconnects, fails a health probe, or
+    fails max_failures renders in a row. Each launch starts a new generation:
+    failures are only counted against the browser they happened on, and a
+    still connected browser is drained of running renders before it is closed.
+    """
+
+    def __init__(self, farm: "RenderFarm", index: int):
+        self.farm = farm
+        self.index = index
+        self.browser: Optional[Browser] = None
+        self.pool = PagePool(
+            BROWSER_POOL_SIZE, BROWSER_PAGE_MAX_RENDERS, BROWSER_PAGE_MAX_HEAP_MB
+        )
+        self.lock = asyncio.Lock()
+        # Cleared while the browser is being replaced
+        self.ready = asyncio.Event()
+        self.ready.set()
+        self.generation = 0
+        self.tasks: List[asyncio.Task] = []
+        self.renders = 0
+        self.failures = 0
+        self.restarts = 0
+
+    def healthy(self) -> bool:
+        return (
+            self.browser is not None
+            and self.browser.is_connected()
+            and self.failures < RENDER_WORKER_MAX_FAILURES
+        )
+
+    async def _launch(self) -> None:
+        self.browser = await self.farm.playwright.chromium.launch(
+            headless=True, args=CHROMIUM_ARGS
+        )
+        self.pool = PagePool(
+            BROWSER_POOL_SIZE, BROWSER_PAGE_MAX_RENDERS, BROWSER_PAGE_MAX_HEAP_MB
+        )
+        await self.pool.warm(self.browser)
+        self.failures = 0
+
+    async def _close_browser(self) -> None:
+        await self.pool.close()
+        if self.browser is not None:
+            try:
+                await self.browser.close()
+            except Exception as e:
+                logger.debug(f"[RENDER {self.index}] Error closing browser: {e}")
+
+    async def restart(self, reason: str, generation: int) -> None:
+        """
+        Replace the browser, letting renders still running on it finish first.
+        Args:
+            reason: Logged cause of the restart.
+            generation: Browser generation the caller found faulty; nothing is
+                done if it was already replaced.
+        """
+        async with self.lock:
+            if generation != self.generation:
+                return  # already restarted by a concurrent caller
+            logger.warning(f"[RENDER {self.index}] Restarting browser: {reason}")
+            self.ready.clear()
+            try:
+                if self.browser is not None and self.browser.is_connected():
+                    if not await self.pool.drain(RENDER_JOB_TIMEOUT):
+                        logger.warning(
+                            f"[RENDER {self.index}] Closing browser with "
+                            f"{self.pool.in_use} renders still running"
+                        )
+                # Renders failing from here on belong to the replaced browser
+                self.generation += 1
+                await self._close_browser()
+                await self._launch()
+                self.restarts += 1
+            finally:
+                self.ready.set()
+
+    async def start(self) -> None:
+        await self._launch()
+        self.tasks = [
+            asyncio.create_task(self._consume()) for _ in range(self.pool.size)
+        ]
+        self.tasks.append(asyncio.create_task(self._health()))
+        logger.info(f"[RENDER {self.index}] Worker ready with {self.pool.size} pages")
+
+    async def stop(self) -> None:
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        await self._close_browser()
+
+    async def _consume(self) -> None:
+        while True:
+            job = await self.farm.queue.get()
+            try:
+                await self._run(job)
+            except Exception as e:
+                logger.error(f"[RENDER {self.index}] Worker error: {e}")
+            finally:
+                self.farm.queue.task_done()
+
+    async def _run(self, job: RenderJob) -> None:
+        if job.future.done():
+            return  # caller gave up
+        job.attempts += 1
+        await self.ready.wait()
+        if not self.healthy():
+            await self.restart("unhealthy before render", self.generation)
+            await self.ready.wait()
+        generation = self.generation
+        try:
+            async with self.pool.page(self.browser) as page:
+                started = time.monotonic()
+                image, outcome = await render_page(page, job.url, job.delay)
+        except Exception as e:
+            if generation != self.generation:
+                # Browser replaced under this render; not the job's fault
+                job.attempts -= 1
+                self.farm.queue.put_nowait(job)
+                return
+            self.failures += 1
+            crashed = not (self.browser and self.browser.is_connected())
+            if crashed and job.attempts < MAX_ATTEMPTS:
+                self.farm.queue.put_nowait(job)
+            elif not job.future.done():
+                job.future.set_exception(e)
+            if crashed or self.failures >= RENDER_WORKER_MAX_FAILURES:
+                await self.restart(
+                    f"{self.failures} consecutive failures: {e}", generation
+                )
+            return
+
+        render_times.record(job.chain, job.token, time.monotonic() - started, outcome)
+        self.renders += 1
+        if generation == self.generation:
+            self.failures = 0
+        if not job.future.done():
+            job.future.set_result(image)
+
+    async def _probe(self) -> None:
+        context = await self.browser.new_context()
+        await context.close()
+
+    async def _health(self) -> None:
+        while True:
+            await asyncio.sleep(RENDER_HEALTH_INTERVAL)
+            generation = self.generation
+            try:
+                if not (self.browser and self.browser.is_connected()):
+                    raise Exception("browser disconnected")
+                await asyncio.wait_for(self._probe(), timeout=10)
+            except Exception as e:
+                try:
+                    await self.restart(f"health check failed: {e}", generation)
+                except Exception as e:
+                    logger.error(f"[RENDER {self.index}] Restart failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "connected": bool(self.browser and self.browser.is_connected()),
+            "renders": self.renders,
+            "failures": self.failures,
+            "restarts": self.restarts,
+            "pool": self.pool.stats(),
+        }
+
+
+class RenderFarm:
+    """
+    Pool of independent browser workers sharing one job queue.
+    In 'local' mode the workers run in this process. In 'remote' mode jobs are
+    pushed to a Valkey list and rendered by separate `render_worker` processes.
+    """
+
+    def __init__(self, workers: int, mode: str):
+        self.size = max(1, workers)
+        self.mode = mode
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.workers: List[RenderWorker] = []
+        self.playwright: Optional[Playwright] = None
+        self.lock = asyncio.Lock()
+        self.remote_jobs = 0
+
+    @property
+    def remote(self) -> bool:
+        return self.mode == "remote" and valkey is not None
+
+    async def start(self) -> None:
+        """
+        Launch the local browser workers, if not already running.
+        """
+        async with self.lock:
+            if self.workers:
+                return
+            self.playwright = await async_playwright().start()
+            workers = [RenderWorker(self, i) for i in range(self.size)]
+            await asyncio.gather(*(worker.start() for worker in workers))
+            self.workers = workers
+
+    async def stop(self) -> None:
+        async with self.lock:
+            await asyncio.gather(
+                *(worker.stop() for worker in self.workers), return_exceptions=True
+            )
+            self.workers = []
+            if self.playwright is not None:
+                await self.playwright.stop()
+                self.playwright = None
+
+    async def render_local(self, chain: str, token: str, url: str, delay: int) -> bytes:
+        if not self.workers:
+            await self.start()
+        job = RenderJob(chain, token, url, delay)
+        self.queue.put_nowait(job)
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(job.future), timeout=RENDER_JOB_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            job.future.cancel()
+            raise Exception(f"[RENDER] Timed out rendering {chain}:{token}")
+
+    async def render_remote(
+        self, chain: str, token: str, url: str, delay: int
+    ) -> bytes:
+        job_id = uuid.uuid4().hex
+        frame, _ = encode_value(
+            {
+                "id": job_id,
+                "chain": chain,
+                "token": token,
+                "url": url,
+                "delay": delay,
+                # Wall clock, so workers on other machines can drop expired jobs
+                "deadline": time.time() + RENDER_JOB_TIMEOUT,
+            }
+        )
+        await valkey.lpush(RENDER_QUEUE_KEY, frame)
+        self.remote_jobs += 1
+        reply = await valkey.blpop([result_key(job_id)], timeout=RENDER_JOB_TIMEOUT)
+        if not reply:
+            raise Exception(f"[RENDER] No render worker answered for {chain}:{token}")
+        body = reply[1]
+        if body.startswith(b"OK"):
+            return body[2:]
+        raise Exception(body[2:].decode(errors="replace"))
+
+    async def render(self, chain: str, token: str, url: str, delay: int) -> bytes:
+        """
+        Render a Bubblemap on the next available worker.
+        Args:
+            chain: Blockchain network identifier (e.g., 'eth').
+            token: Token address.
+            url: Bubblemap iframe URL.
+            delay: Fixed delay in seconds used when readiness detection is off or fails.
+        Returns:
+            bytes: PNG image data.
+        Raises:
+            Exception: If rendering fails or times out.
+        """
+        if self.remote:
+            return await self.render_remote(chain, token, url, delay)
+        return await self.render_local(chain, token, url, delay)
+
+    async def _serve_job(self, frame: bytes) -> None:
+        job, _ = decode_value(frame)
+        if time.time() > job.get("deadline", float("inf")):
+            logger.info(
+                f"[RENDER] Dropping expired job for {job['chain']}:{job['token']}"
+            )
+            return
+        try:
+            image = await self.render_local(
+                job["chain"], job["token"], job["url"], job["delay"]
+            )
+            body = b"OK" + image
+        except Exception as e:
+            body = b"ER" + str(e).encode()
+        key = result_key(job["id"])
+        async with valkey.pipeline(transaction=False) as pipe:
+            await pipe.rpush(key, body).expire(key, RESULT_TTL).execute()
+
+    async def _serve_one(self) -> None:
+        while True:
+            try:
+                item = await valkey.brpop([RENDER_QUEUE_KEY], timeout=5)
+                if item:
+                    await self._serve_job(item[1])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[RENDER] Failed to serve render job: {e}")
+                await asyncio.sleep(1)
+
+    async def serve(self) -> None:
+        """
+        Render jobs from the Valkey queue until cancelled (render worker process).
+        """
+        await self.start()
+        capacity = sum(worker.pool.size for worker in self.workers)
+        logger.info(f"[RENDER] Serving {RENDER_QUEUE_KEY} with {capacity} slots")
+        await asyncio.gather(*(self._serve_one() for _ in range(capacity)))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": "remote" if self.remote else "local",
+            "queued": self.queue.qsize(),
+            "remote_jobs": self.remote_jobs,
+            "workers": [worker.stats() for worker in self.workers],
+        }
+
+
+render_farm = RenderFarm(RENDER_WORKERS, RENDER_FARM_MODE)
+
+
+async def init_render_farm() -> None:
+    """
+    Start the local render workers unless rendering is delegated to remote workers.
+    """
+    if RENDER_FARM_MODE == "remote" and valkey is None:
+        logger.warning("[RENDER] Remote render farm requires Valkey, rendering locally")
+    if not render_farm.remote:
+        await render_farm.start()
+
+
+async def shutdown_render_farm(_: Application) -> None:
+    """
+    Close every local browser during application shutdown.
+    Args:
+        _: Telegram Application instance (unused).
+    """
+    await render_farm.stop()
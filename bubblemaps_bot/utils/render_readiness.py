@@ -0,0 +1,126 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from playwright.async_api import ElementHandle, Page
+
+from bubblemaps_bot import (
+    BROWSER_RENDER_POLL_MS,
+    BROWSER_RENDER_STABLE_MS,
+    BROWSER_RENDER_TIMEOUT,
+    MAP_INDEX_MAX_TOKENS,
+    logger,
+)
+
+# Node count and rounded bounding box of the map SVG
+SVG_GEOMETRY_JS = """
+(svg) => {
+    const box = svg.getBoundingClientRect();
+    return [
+        svg.querySelectorAll('*').length,
+        Math.round(box.x), Math.round(box.y),
+        Math.round(box.width), Math.round(box.height),
+    ];
+}
+"""
+
+
+async def wait_for_network_idle(page: Page, timeout: float) -> None:
+    try:
+        await page.wait_for_load_state("networkidle", timeout=timeout * 1000)
+    except Exception:
+        pass
+
+
+async def wait_for_render(page: Page, svg: ElementHandle) -> Tuple[float, str]:
+    """
+    Wait until the map SVG has finished rendering.
+    The map is ready once its node count and bounding box stay unchanged for
+    BROWSER_RENDER_STABLE_MS, or for a single poll once the network is idle,
+    bounded by BROWSER_RENDER_TIMEOUT.
+    Args:
+        page: Page the map is loading in.
+        svg: The map's root SVG element.
+    Returns:
+        tuple: (seconds waited, 'stable', 'network_idle' or 'timeout').
+    """
+    started = time.monotonic()
+    deadline = started + BROWSER_RENDER_TIMEOUT
+    poll = BROWSER_RENDER_POLL_MS / 1000
+    stable_for = BROWSER_RENDER_STABLE_MS / 1000
+
+    idle = asyncio.create_task(wait_for_network_idle(page, BROWSER_RENDER_TIMEOUT))
+    try:
+        previous = None
+        unchanged_since = time.monotonic()
+        while time.monotonic() < deadline:
+            geometry = await svg.evaluate(SVG_GEOMETRY_JS)
+            now = time.monotonic()
+            if geometry != previous or not geometry[0] or not geometry[3]:
+                previous = geometry
+                unchanged_since = now
+            elif now - unchanged_since >= stable_for:
+                return now - started, "stable"
+            elif idle.done():
+                return now - started, "network_idle"
+            await asyncio.sleep(poll)
+        return time.monotonic() - started, "timeout"
+    finally:
+        idle.cancel()
+
+
+class RenderTimes:
+    """
+    Observed render times per token, bounded by token count with LRU eviction.
+    """
+
+    def __init__(self, max_tokens: int):
+        self.max_tokens = max_tokens
+        self.tokens: "OrderedDict[tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self.outcomes: Dict[str, int] = {}
+        self.renders = 0
+        self.total_seconds = 0.0
+
+    def record(self, chain: str, token: str, seconds: float, outcome: str) -> None:
+        """
+        Record one render.
+        Args:
+            chain: Blockchain network identifier (e.g., 'eth').
+            token: Token address.
+            seconds: Time from navigation to screenshot.
+            outcome: How readiness was decided ('stable', 'network_idle',
+                'timeout' or 'fallback').
+        """
+        key = (chain, token.lower())
+        entry = self.tokens.get(key) or {"renders": 0, "total": 0.0, "max": 0.0}
+        entry["renders"] += 1
+        entry["total"] += seconds
+        entry["last"] = seconds
+        entry["max"] = max(entry["max"], seconds)
+        self.tokens[key] = entry
+        self.tokens.move_to_end(key)
+        while len(self.tokens) > self.max_tokens:
+            self.tokens.popitem(last=False)
+
+        self.renders += 1
+        self.total_seconds += seconds
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        logger.info(f"[RENDER] {chain}:{token} rendered in {seconds:.1f}s ({outcome})")
+
+    def get(self, chain: str, token: str) -> Optional[Dict[str, Any]]:
+        return self.tokens.get((chain, token.lower()))
+
+    def stats(self) -> Dict[str, Any]:
+        slowest = sorted(
+            self.tokens.items(), key=lambda item: item[1]["max"], reverse=True
+        )[:3]
+        return {
+            "renders": self.renders,
+            "average": self.total_seconds / self.renders if self.renders else 0.0,
+            "outcomes": dict(self.outcomes),
+            "slowest": [(f"{c}:{t}", entry["max"]) for (c, t), entry in slowest],
+        }
+
+
+render_times = RenderTimes(MAP_INDEX_MAX_TOKENS)
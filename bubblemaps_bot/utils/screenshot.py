@@ -1,56 +1,74 @@
 import asyncio
-import base64
-from typing import List, Tuple
+import hashlib
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional, Tuple, Union
 
-import aiohttp
-from playwright.async_api import Browser, async_playwright
+from telegram import Message
+from telegram.error import BadRequest
 
 import bubblemaps_bot.utils.bubblemaps_metadata
 from bubblemaps_bot import (
+    FRESHNESS_TTL,
     IFRAME_TEMPLATE_URL,
+    IMAGE_KEEP_ORIGINAL,
     MAP_AVAILABILITY_URL,
     SCREENSHOT_CACHE_ENABLED,
     VALKEY_ENABLED,
     VALKEY_TTL,
     logger,
 )
-from bubblemaps_bot.db.screenshot import get_token_screenshot, upsert_token_screenshot
-from bubblemaps_bot.utils.bubblemaps_metadata import fetch_token_metadata_update_date
-from bubblemaps_bot.utils.valkey import get_cache, set_cache
-
-
-DEFAULT_VIEWPORT = {"width": 1200, "height": 800}
-DEFAULT_USER_AGENT = (
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-    "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+from bubblemaps_bot.db.screenshot import (
+    get_screenshot_file_id,
+    get_token_screenshot,
+    upsert_screenshot_file_id,
+    upsert_token_screenshot,
+    upsert_token_screenshot_original,
+)
+from bubblemaps_bot.utils import http_client
+from bubblemaps_bot.utils.bubblemaps_metadata import (
+    fetch_token_metadata_update_date,
+    freshness_stats,
+    is_same_update,
+)
+from bubblemaps_bot.utils.image_encoding import (
+    encode_screenshot,
+    image_dimensions,
+    sniff_format,
+)
+from bubblemaps_bot.utils.render_farm import render_farm
+from bubblemaps_bot.utils.singleflight import single_flight
+from bubblemaps_bot.utils.valkey import (
+    cache_key,
+    get_blob,
+    get_cache,
+    set_blob,
+    set_cache,
 )
 
 
-# Persistent browser and concurrency limit
-browser: Browser = None
-semaphore = asyncio.Semaphore(5)  # limit concurrent screenshot tasks
 locks = {}
 
 
-async def init_browser():
+async def cache_screenshot(
+    valkey_key: str, image: bytes, update_date: datetime
+) -> None:
     """
-    Initialize a headless Chromium browser instance for screenshot capture.
+    Store screenshot bytes in the binary Valkey channel with their metadata.
+    Args:
+        valkey_key: Cache key.
+        image: Screenshot image data.
+        update_date: Map update date the screenshot was taken for.
     """
-    global browser, playwright
-    if not browser:
-        playwright = await async_playwright().start()
-        browser = await playwright.chromium.launch(
-            headless=True,
-            args=[
-                "--no-sandbox",
-                "--disable-setuid-sandbox",
-                "--disable-dev-shm-usage",
-                "--disable-accelerated-2d-canvas",
-                "--no-first-run",
-                "--no-zygote",
-                "--disable-gpu",
-            ],
-        )
+    width, height = image_dimensions(image)
+    meta = {
+        "update_date": update_date.isoformat(),
+        "format": sniff_format(image),
+        "sha256": hashlib.sha256(image).hexdigest(),
+        "width": width,
+        "height": height,
+    }
+    logger.debug(f"[CACHE SET] {valkey_key} - TTL: {VALKEY_TTL}, meta: {meta}")
+    await set_blob(valkey_key, image, meta, ttl=VALKEY_TTL)
 
 
 def build_iframe_url(chain: str, token: str) -> str:
@@ -65,44 +83,141 @@ def build_iframe_url(chain: str, token: str) -> str:
     return IFRAME_TEMPLATE_URL.format(chain=chain, token=token)
 
 
-async def check_map_availability(chain: str, token: str) -> bool:
+async def fetch_map_availability(chain: str, token: str) -> Optional[bool]:
     """
-    Check if a Bubblemap is available for the given chain and token.
+    Ask the Bubblemaps API whether a map is available.
     Args:
         chain: Blockchain network identifier (e.g., 'eth').
         token: Token address.
     Returns:
-        bool: True if available, False otherwise.
+        bool: Availability, None if the API could not answer.
     """
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                MAP_AVAILABILITY_URL, params={"chain": chain, "token": token}
-            ) as resp:
-                data = await resp.json()
-                if data.get("status") == "OK":
-                    return data.get("availability", False)
-                else:
-                    logger.warning(f"[AVAILABILITY] KO: {data.get('message')}")
-                    return False
+        async with http_client.get(
+            MAP_AVAILABILITY_URL, params={"chain": chain, "token": token}
+        ) as resp:
+            data = await resp.json()
+            if data.get("status") == "OK":
+                return data.get("availability", False)
+            else:
+                logger.warning(f"[AVAILABILITY] KO: {data.get('message')}")
+                return False
     except Exception as e:
         logger.error(f"[AVAILABILITY CHECK ERROR] {e}")
-        return False
+        return None
 
 
-async def capture_bubblemap(chain: str, token: str, delay: int = 10) -> bytes:
+async def check_map_availability(chain: str, token: str) -> bool:
     """
-    Capture a screenshot of a Bubblemap for the given chain and token.
+    Check if a Bubblemap is available for the given chain and token.
+    Answers are reused for FRESHNESS_TTL seconds.
     Args:
         chain: Blockchain network identifier (e.g., 'eth').
         token: Token address.
-        delay: Delay in seconds before capturing screenshot (default: 10).
     Returns:
-        bytes: Screenshot image data.
+        bool: True if available, False otherwise.
+    """
+    key = await cache_key("availability", chain, token)
+    cached = await get_cache(key)
+    if cached:
+        freshness_stats["availability_hits"] += 1
+        return cached["available"]
+
+    freshness_stats["availability_misses"] += 1
+
+    async def download():
+        available = await fetch_map_availability(chain, token)
+        if available is not None:
+            await set_cache(key, {"available": available}, ttl=FRESHNESS_TTL)
+        return {"available": bool(available)}
+
+    result = await single_flight("avail", chain, token, download, cache_key=key)
+    return result["available"]
+
+
+async def find_stored_screenshot(
+    chain: str, token: str, latest_update: datetime
+) -> Optional[bytes]:
+    """
+    Look up an up-to-date screenshot in Valkey, then in the database.
+    A database hit repopulates the Valkey cache.
+    Args:
+        chain: Blockchain network identifier (e.g., 'eth').
+        token: Token address.
+        latest_update: Current map update date.
+    Returns:
+        bytes: Screenshot image data, None if no stored screenshot is current.
+    """
+    valkey_key = await cache_key("screenshot", chain, token)
+
+    if VALKEY_ENABLED and SCREENSHOT_CACHE_ENABLED:
+        cached = await get_blob(valkey_key)
+        if cached:
+            image, meta = cached
+            cached_update_date = meta.get("update_date")
+            logger.debug(
+                f"[CACHE CHECK] {chain}:{token} - cached_update_date: {cached_update_date}, expected: {latest_update.isoformat()}"
+            )
+            if is_same_update(cached_update_date, latest_update):
+                logger.info(f"[CACHE HIT] {valkey_key}")
+                return image
+            else:
+                logger.info(
+                    f"[CACHE MISS] {valkey_key} - cached_update_date does not match"
+                )
+        else:
+            logger.info(f"[CACHE MISS] {valkey_key} - no cache entry")
+
+    existing = await get_token_screenshot(chain, token)
+    if existing:
+        db_update_date = existing.update_date.replace(microsecond=0, tzinfo=None)
+        logger.debug(f"[DB CHECK] {chain}:{token} - db_update_date: {db_update_date}")
+        if db_update_date == latest_update:
+            logger.info(f"[DB HIT] Up-to-date screenshot for {chain}:{token}")
+            if VALKEY_ENABLED and SCREENSHOT_CACHE_ENABLED:
+                await cache_screenshot(valkey_key, existing.image_data, latest_update)
+                logger.info(f"Repopulated cache for {valkey_key}")
+            return existing.image_data
+    else:
+        logger.debug(f"[DB CHECK] No screenshot found in database for {chain}:{token}")
+
+    return None
+
+
+async def lookup_screenshot(chain: str, token: str) -> Optional[Tuple[bytes, datetime]]:
+    """
+    Find a stored screenshot of the current map version without rendering.
+    Args:
+        chain: Blockchain network identifier (e.g., 'eth').
+        token: Token address.
+    Returns:
+        tuple: (screenshot image data, map update date), None if a render is needed.
+    """
+    latest_update = await fetch_token_metadata_update_date(chain, token)
+    if not latest_update:
+        return None
+    screenshot = await find_stored_screenshot(chain, token, latest_update)
+    if screenshot is None:
+        return None
+    return screenshot, latest_update
+
+
+async def capture_bubblemap_version(
+    chain: str, token: str, delay: int = 10
+) -> Tuple[bytes, datetime]:
+    """
+    Capture a screenshot of a Bubblemap along with the map update date it shows.
+    Args:
+        chain: Blockchain network identifier (e.g., 'eth').
+        token: Token address.
+        delay: Delay in seconds before capturing screenshot when readiness
+            detection is disabled or fails (default: 10).
+    Returns:
+        tuple: (screenshot image data, map update date).
     Raises:
         Exception: If screenshot capture fails or map is unavailable.
     """
-    valkey_key = f"bubblemap:screenshot:{chain}:{token}"
+    valkey_key = await cache_key("screenshot", chain, token)
     lock_key = f"{chain}:{token}"
 
     logger.debug(
@@ -116,48 +231,11 @@ async def capture_bubblemap(chain: str, token: str, delay: int = 10) -> bytes:
         if not latest_update:
             raise Exception(f"[NO UPDATE INFO] No update date for {chain}:{token}")
 
-        latest_update = latest_update.replace(microsecond=0, tzinfo=None)
         logger.debug(f"[UPDATE DATE] {chain}:{token} - latest_update: {latest_update}")
 
-        if VALKEY_ENABLED and SCREENSHOT_CACHE_ENABLED:
-            cached = await get_cache(valkey_key)
-            logger.debug(f"[CACHE CHECK] {chain}:{token} - raw cache data: {cached}")
-            if cached:
-                cached_update_date = cached.get("update_date")
-                logger.debug(
-                    f"[CACHE CHECK] {chain}:{token} - cached_update_date: {cached_update_date}, expected: {latest_update.isoformat()}"
-                )
-                if cached_update_date == latest_update.isoformat():
-                    logger.info(f"[CACHE HIT] {valkey_key}")
-                    return base64.b64decode(cached["image"])
-                else:
-                    logger.info(
-                        f"[CACHE MISS] {valkey_key} - cached_update_date does not match"
-                    )
-            else:
-                logger.info(f"[CACHE MISS] {valkey_key} - no cache entry")
-
-        existing = await get_token_screenshot(chain, token)
-        if existing:
-            db_update_date = existing.update_date.replace(microsecond=0, tzinfo=None)
-            logger.debug(
-                f"[DB CHECK] {chain}:{token} - db_update_date: {db_update_date}"
-            )
-            if db_update_date == latest_update:
-                logger.info(f"[DB HIT] Up-to-date screenshot for {chain}:{token}")
-                if VALKEY_ENABLED and SCREENSHOT_CACHE_ENABLED:
-                    cache_data = {
-                        "image": base64.b64encode(existing.image_data).decode("utf-8"),
-                        "update_date": latest_update.isoformat(),
-                    }
-                    logger.debug(f"[CACHE SET] {valkey_key} - TTL: {VALKEY_TTL}")
-                    await set_cache(valkey_key, cache_data, ttl=VALKEY_TTL)
-                    logger.info(f"Repopulated cache for {valkey_key}")
-                return existing.image_data
-        else:
-            logger.debug(
-                f"[DB CHECK] No screenshot found in database for {chain}:{token}"
-            )
+        stored = await find_stored_screenshot(chain, token, latest_update)
+        if stored is not None:
+            return stored, latest_update
 
         is_available = await check_map_availability(chain, token)
         if not is_available:
@@ -167,97 +245,87 @@ async def capture_bubblemap(chain: str, token: str, delay: int = 10) -> bytes:
 
         url = IFRAME_TEMPLATE_URL.format(chain=chain, token=token)
 
-        global browser
-        if not browser or not browser.is_connected():
-            await init_browser()
-
         try:
-            async with semaphore:
-                context = await browser.new_context(
-                    viewport=DEFAULT_VIEWPORT,
-                    user_agent=DEFAULT_USER_AGENT,
-                    java_script_enabled=True,
+            original = await render_farm.render(chain, token, url, delay)
+            screenshot = await asyncio.to_thread(encode_screenshot, original)
+
+            if VALKEY_ENABLED and SCREENSHOT_CACHE_ENABLED:
+                await cache_screenshot(valkey_key, screenshot, latest_update)
+                logger.info(f"Cached screenshot under {valkey_key}")
+
+            await upsert_token_screenshot(chain, token, latest_update, screenshot)
+            logger.info(f"Saved screenshot to database for {chain}:{token}")
+
+            if IMAGE_KEEP_ORIGINAL and screenshot is not original:
+                await upsert_token_screenshot_original(
+                    chain, token, latest_update, original
                 )
-                page = await context.new_page()
-                try:
-                    await page.goto(url, wait_until="domcontentloaded", timeout=30000)
-                    await asyncio.sleep(5)
-
-                    try:
-                        await page.evaluate(
-                            """
-                            () => {
-                                const elements = Array.from(document.querySelectorAll("*"));
-                                for (const el of elements) {
-                                    if (el.innerText && el.innerText.trim() === 'CLOSE') {
-                                        el.click();
-                                    }
-                                }
-                            }
-                            """
-                        )
-                        await asyncio.sleep(2)
-                    except Exception as e:
-                        logger.warning(f"Failed to close popup: {e}")
-
-                    await page.evaluate(
-                        """
-                        () => {
-                            const banner = document.querySelector('div.fundraising-banner.--desktop');
-                            if (banner) banner.remove();
-
-                            const header = document.querySelector('header.mdc-top-app-bar.mdc-top-app-bar--fixed');
-                            if (header) header.style.display = 'flex';
-                        }
-                        """
-                    )
-
-                    svg_element = await page.query_selector("#svg")
-                    if not svg_element:
-                        raise Exception("SVG element with id='svg' not found")
-
-                    await svg_element.evaluate(
-                        """
-                        (svg) => {
-                            svg.style.visibility = 'visible';
-                            svg.style.opacity = '1';
-                        }
-                        """
-                    )
-
-                    await asyncio.sleep(delay)
-
-                    bounding_box = await svg_element.bounding_box()
-                    if not bounding_box:
-                        raise Exception("SVG bounding box not available")
-
-                    screenshot = await svg_element.screenshot(type="png")
-
-                    if VALKEY_ENABLED and SCREENSHOT_CACHE_ENABLED:
-                        cache_data = {
-                            "image": base64.b64encode(screenshot).decode("utf-8"),
-                            "update_date": latest_update.isoformat(),
-                        }
-                        logger.debug(f"[CACHE SET] {valkey_key} - TTL: {VALKEY_TTL}")
-                        await set_cache(valkey_key, cache_data, ttl=VALKEY_TTL)
-                        logger.info(f"Cached screenshot under {valkey_key}")
-
-                    await upsert_token_screenshot(
-                        chain, token, latest_update, screenshot
-                    )
-                    logger.info(f"Saved screenshot to database for {chain}:{token}")
-
-                    return screenshot
-
-                finally:
-                    await page.close()
-                    await context.close()
+
+            return screenshot, latest_update
 
         except Exception as e:
             logger.error(f"SVG capture failed: {e}")
             raise
 
 
+async def capture_bubblemap(chain: str, token: str, delay: int = 10) -> bytes:
+    """
+    Capture a screenshot of a Bubblemap for the given chain and token.
+    Args:
+        chain: Blockchain network identifier (e.g., 'eth').
+        token: Token address.
+        delay: Delay in seconds before capturing screenshot when readiness
+            detection is disabled or fails (default: 10).
+    Returns:
+        bytes: Screenshot image data.
+    Raises:
+        Exception: If screenshot capture fails or map is unavailable.
+    """
+    screenshot, _ = await capture_bubblemap_version(chain, token, delay)
+    return screenshot
+
+
+async def send_screenshot(
+    chain: str,
+    token: str,
+    update_date: Optional[datetime],
+    screenshot: bytes,
+    send: Callable[[Union[str, bytes]], Awaitable[Union[Message, bool]]],
+) -> Union[Message, bool]:
+    """
+    Send a screenshot, referencing the Telegram file_id of an earlier upload if any.
+    The file_id returned by the first upload of each image is stored under the
+    map version and the image hash, so later sends of the same bytes skip the
+    upload while a re-render or a change of encoding settings is uploaded anew.
+    Args:
+        chain: Blockchain network identifier (e.g., 'eth').
+        token: Token address.
+        update_date: Map update date the screenshot shows, None if unknown.
+        screenshot: Screenshot image data, uploaded if no file_id is known.
+        send: Coroutine function sending a photo (file_id or bytes) and
+            returning the sent message.
+    Returns:
+        The result of send.
+    """
+    image_sha256 = hashlib.sha256(screenshot).hexdigest()
+    if update_date:
+        file_id = await get_screenshot_file_id(
+            chain, token, update_date, image_sha256
+        )
+        if file_id:
+            try:
+                return await send(file_id)
+            except BadRequest as e:
+                logger.warning(f"[FILE ID] Stale file_id for {chain}:{token}: {e}")
+
+    message = await send(screenshot)
+    if update_date and isinstance(message, Message) and message.photo:
+        await upsert_screenshot_file_id(
+            chain, token, update_date, image_sha256, message.photo[-1].file_id
+        )
+    return message
+
+
 async def capture_multiple_bubblemaps(tasks: List[Tuple[str, str]]) -> List[bytes]:
     """
     Capture multiple Bubblemap screenshots concurrently.
@@ -0,0 +1,150 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from bubblemaps_bot import (
+    SINGLE_FLIGHT_LOCK,
+    SINGLE_FLIGHT_LOCK_TIMEOUT,
+    VALKEY_KEY_PREFIX,
+    logger,
+)
+from bubblemaps_bot.utils.valkey import get_cache, valkey
+
+POLL_INTERVAL = 0.25
+
+stats = {"leaders": 0, "coalesced": 0, "remote_waits": 0}
+
+
+class Flight:
+    """An in-flight upstream call shared by every caller with the same key."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+flights: Dict[str, Flight] = {}
+
+
+async def _wait_for_remote(
+    lock_name: str, cache_key: str, is_fresh: Optional[Callable[[Any], bool]]
+) -> Optional[Any]:
+    """
+    Wait for another process holding the lock to populate the cache.
+    The cache may already hold the stale entry that triggered the call, so it is
+    only trusted once the lock is released, or earlier if is_fresh accepts it.
+    Args:
+        lock_name: Valkey lock key.
+        cache_key: Cache key the lock holder will write.
+        is_fresh: Optional predicate telling whether a cached value was written
+            by the lock holder.
+    Returns:
+        Cached value once available, None if the lock went away without one.
+    """
+    stats["remote_waits"] += 1
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + SINGLE_FLIGHT_LOCK_TIMEOUT
+    while loop.time() < deadline:
+        await asyncio.sleep(POLL_INTERVAL)
+        if is_fresh is not None:
+            cached = await get_cache(cache_key, skip_l1=True)
+            if cached and is_fresh(cached):
+                return cached
+        if not await valkey.exists(lock_name):
+            return await get_cache(cache_key, skip_l1=True)
+    return None
+
+
+async def _lead(
+    key: str,
+    fn: Callable[[], Awaitable[Any]],
+    cache_key: Optional[str],
+    is_fresh: Optional[Callable[[Any], bool]],
+) -> Any:
+    """
+    Run the upstream call, optionally under a cross-process Valkey lock.
+    """
+    stats["leaders"] += 1
+    if not (SINGLE_FLIGHT_LOCK and valkey and cache_key):
+        return await fn()
+
+    lock_name = f"{VALKEY_KEY_PREFIX}:singleflight:{key}"
+    lock = valkey.lock(lock_name, timeout=SINGLE_FLIGHT_LOCK_TIMEOUT)
+    try:
+        acquired = await lock.acquire(blocking=False)
+    except Exception as e:
+        logger.error(f"[SINGLE FLIGHT] Lock error for {key}: {e}")
+        return await fn()
+
+    if not acquired:
+        logger.debug(f"[SINGLE FLIGHT] {key} is being fetched by another process")
+        cached = await _wait_for_remote(lock_name, cache_key, is_fresh)
+        if cached:
+            return cached
+        return await fn()
+
+    try:
+        return await fn()
+    finally:
+        try:
+            await lock.release()
+        except Exception as e:
+            logger.debug(f"[SINGLE FLIGHT] Lock release failed for {key}: {e}")
+
+
+async def single_flight(
+    kind: str,
+    chain: str,
+    token: str,
+    fn: Callable[[], Awaitable[Any]],
+    cache_key: Optional[str] = None,
+    is_fresh: Optional[Callable[[Any], bool]] = None,
+) -> Any:
+    """
+    Coalesce concurrent calls for the same (kind, chain, token) into one upstream call.
+    Args:
+        kind: Kind of payload (e.g., 'map', 'meta').
+        chain: Blockchain network identifier (e.g., 'eth').
+        token: Token address.
+        fn: Coroutine factory performing the upstream call and caching its result.
+        cache_key: Cache key written by fn; enables cross-process coordination.
+        is_fresh: Predicate recognising a value written by another process's
+            call, so waiting on it can end before its lock is released.
+    Returns:
+        The shared result of fn.
+    """
+    key = f"{kind}:{chain}:{token.lower()}"
+    flight = flights.get(key)
+    if flight is None:
+        flight = Flight(asyncio.create_task(_lead(key, fn, cache_key, is_fresh)))
+        flights[key] = flight
+
+        def _landed(_: asyncio.Task) -> None:
+            if flights.get(key) is flight:
+                del flights[key]
+
+        flight.task.add_done_callback(_landed)
+    else:
+        stats["coalesced"] += 1
+        logger.debug(f"[SINGLE FLIGHT] Joining in-flight request for {key}")
+
+    flight.waiters += 1
+    try:
+        return await asyncio.shield(flight.task)
+    except asyncio.CancelledError:
+        # Only abandon the upstream call once nobody is waiting on it
+        if flight.waiters == 1 and not flight.task.done():
+            flight.task.cancel()
+        raise
+    finally:
+        flight.waiters -= 1
+
+
+def get_single_flight_stats() -> Dict[str, int]:
+    """
+    Report request coalescing counters.
+    Returns:
+        dict: Upstream calls made, callers coalesced and cross-process waits.
+    """
+    return {**stats, "in_flight": len(flights)}
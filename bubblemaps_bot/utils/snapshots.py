@@ -0,0 +1,130 @@
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from bubblemaps_bot import SNAPSHOT_MAX_TOKENS, logger
+
+
+class DistributionSnapshot:
+    """
+    Immutable ranked holder list for one (chain, token, map version), shared by
+    every session paging through it.
+    """
+
+    __slots__ = ("chain", "token", "version", "nodes", "cumulative", "pages", "refs")
+
+    def __init__(
+        self,
+        chain: str,
+        token: str,
+        version: Optional[str],
+        nodes: Tuple[dict, ...],
+        cumulative: Tuple[float, ...],
+        pages: Tuple[Tuple[int, int], ...],
+    ):
+        self.chain = chain
+        self.token = token
+        self.version = version
+        self.nodes = nodes
+        self.cumulative = cumulative
+        self.pages = pages
+        self.refs = 0
+
+    @property
+    def total_pages(self) -> int:
+        return max(len(self.pages), 1)
+
+    def page(self, page: int) -> List[Tuple[int, dict, float]]:
+        """
+        Return the holders on a page.
+        Args:
+            page: Zero-based page number.
+        Returns:
+            list: (rank, node, cumulative percentage) tuples, rank starting at 1.
+        """
+        if not 0 <= page < len(self.pages):
+            return []
+        start, end = self.pages[page]
+        return [
+            (rank + 1, self.nodes[rank], self.cumulative[rank])
+            for rank in range(start, end)
+        ]
+
+
+SnapshotKey = Tuple[str, str, Optional[str]]
+
+
+class SnapshotStore:
+    """
+    Reference-counted snapshot store with LRU eviction.
+    Unreferenced snapshots are evicted first; referenced ones only when the store
+    is still over capacity, since abandoned sessions never release theirs.
+    """
+
+    def __init__(self, max_tokens: int):
+        self.max_tokens = max_tokens
+        self.snapshots: "OrderedDict[SnapshotKey, DistributionSnapshot]" = (
+            OrderedDict()
+        )
+        self.evictions = 0
+
+    @staticmethod
+    def key(chain: str, token: str, version: Optional[str]) -> SnapshotKey:
+        return chain, token.lower(), version
+
+    def get(
+        self, chain: str, token: str, version: Optional[str]
+    ) -> Optional[DistributionSnapshot]:
+        key = self.key(chain, token, version)
+        snapshot = self.snapshots.get(key)
+        if snapshot is not None:
+            self.snapshots.move_to_end(key)
+        return snapshot
+
+    def acquire(
+        self,
+        chain: str,
+        token: str,
+        version: Optional[str],
+        build: Callable[[], DistributionSnapshot],
+    ) -> DistributionSnapshot:
+        """
+        Take a reference on a snapshot, building it if not present.
+        """
+        snapshot = self.get(chain, token, version)
+        if snapshot is None:
+            snapshot = build()
+            self.snapshots[self.key(chain, token, version)] = snapshot
+            self._evict()
+        snapshot.refs += 1
+        return snapshot
+
+    def release(self, chain: str, token: str, version: Optional[str]) -> None:
+        snapshot = self.snapshots.get(self.key(chain, token, version))
+        if snapshot is not None and snapshot.refs > 0:
+            snapshot.refs -= 1
+
+    def _evict(self) -> None:
+        if len(self.snapshots) <= self.max_tokens:
+            return
+        for key in [k for k, s in self.snapshots.items() if s.refs == 0]:
+            if len(self.snapshots) <= self.max_tokens:
+                return
+            del self.snapshots[key]
+            self.evictions += 1
+        while len(self.snapshots) > self.max_tokens:
+            key, snapshot = self.snapshots.popitem(last=False)
+            self.evictions += 1
+            logger.debug(
+                f"[SNAPSHOT] Evicted {key} with {snapshot.refs} live sessions"
+            )
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "snapshots": len(self.snapshots),
+            "sessions": sum(s.refs for s in self.snapshots.values()),
+            "evictions": self.evictions,
+            "max_tokens": self.max_tokens,
+        }
+
+
+distribution_snapshots = SnapshotStore(SNAPSHOT_MAX_TOKENS)
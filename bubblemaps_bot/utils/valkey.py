@@ -1,57 +1,489 @@
+import asyncio
 import json
+import time
+import zlib
+from typing import Any, Awaitable, Callable
 
 from telegram.ext import Application
 from valkey.asyncio import Valkey
 
 from bubblemaps_bot import (
+    SUPPORTED_CHAINS,
+    VALKEY_CODEC,
+    VALKEY_COMPRESSION,
+    VALKEY_COMPRESSION_THRESHOLD,
     VALKEY_DB,
     VALKEY_ENABLED,
     VALKEY_HOST,
+    VALKEY_KEY_PREFIX,
     VALKEY_PORT,
     VALKEY_TTL,
     logger,
 )
+from bubblemaps_bot.utils.l1_cache import MISSING, l1
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
 
 valkey: Valkey | None = None
 
 if VALKEY_ENABLED:
-    valkey = Valkey(
-        host=VALKEY_HOST, port=VALKEY_PORT, db=VALKEY_DB, decode_responses=True
+    # Bytes mode: cache entries are binary codec frames, not JSON text
+    valkey = Valkey(host=VALKEY_HOST, port=VALKEY_PORT, db=VALKEY_DB)
+
+# Codec frame: MAGIC + serializer id + compressor id + payload.
+# Entries without the magic prefix are legacy plain JSON.
+MAGIC = b"BM\x01"
+
+SERIALIZERS: dict[str, tuple[int, Callable[[Any], bytes], Callable[[bytes], Any]]] = {
+    "json": (
+        0,
+        lambda v: json.dumps(v, separators=(",", ":")).encode(),
+        json.loads,
+    ),
+}
+if orjson:
+    SERIALIZERS["orjson"] = (1, orjson.dumps, orjson.loads)
+if msgpack:
+    SERIALIZERS["msgpack"] = (
+        2,
+        lambda v: msgpack.packb(v, use_bin_type=True),
+        lambda b: msgpack.unpackb(b, raw=False),
+    )
+
+COMPRESSORS: dict[str, tuple[int, Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    "none": (0, bytes, bytes),
+    "zlib": (1, lambda b: zlib.compress(b, 6), zlib.decompress),
+}
+if zstandard:
+    COMPRESSORS["zstd"] = (
+        2,
+        zstandard.ZstdCompressor(level=3).compress,
+        zstandard.ZstdDecompressor().decompress,
     )
+if lz4:
+    COMPRESSORS["lz4"] = (3, lz4.frame.compress, lz4.frame.decompress)
+
+DECODERS = {sid: loads for sid, _, loads in SERIALIZERS.values()}
+DECOMPRESSORS = {cid: decompress for cid, _, decompress in COMPRESSORS.values()}
+
+
+def _pick(configured: str, table: dict, preference: list[str], kind: str) -> str:
+    if configured == "auto":
+        return next(name for name in preference if name in table)
+    if configured not in table:
+        fallback = next(name for name in preference if name in table)
+        logger.warning(
+            f"[CODEC] {kind} '{configured}' unavailable, falling back to '{fallback}'"
+        )
+        return fallback
+    return configured
+
+
+serializer_name = _pick(
+    VALKEY_CODEC, SERIALIZERS, ["msgpack", "orjson", "json"], "Serializer"
+)
+compressor_name = _pick(
+    VALKEY_COMPRESSION, COMPRESSORS, ["zstd", "lz4", "zlib", "none"], "Compressor"
+)
+
+codec_stats = {"encoded": 0, "raw_bytes": 0, "stored_bytes": 0}
+
+
+def encode_value(value: Any) -> tuple[bytes, int]:
+    """
+    Serialize and, above the size threshold, compress a value into a codec frame.
+    Args:
+        value: JSON-compatible value.
+    Returns:
+        tuple: (frame bytes, uncompressed serialized size).
+    """
+    serializer_id, dumps, _ = SERIALIZERS[serializer_name]
+    payload = dumps(value)
+    raw_size = len(payload)
+
+    compressor_id = 0
+    if raw_size >= VALKEY_COMPRESSION_THRESHOLD and compressor_name != "none":
+        candidate_id, compress, _ = COMPRESSORS[compressor_name]
+        compressed = compress(payload)
+        if len(compressed) < raw_size:
+            compressor_id, payload = candidate_id, compressed
+
+    frame = MAGIC + bytes((serializer_id, compressor_id)) + payload
+    codec_stats["encoded"] += 1
+    codec_stats["raw_bytes"] += raw_size
+    codec_stats["stored_bytes"] += len(frame)
+    return frame, raw_size
+
+
+def decode_value(blob: bytes) -> tuple[Any, int]:
+    """
+    Decode a codec frame, or a legacy plain JSON entry.
+    Args:
+        blob: Stored bytes.
+    Returns:
+        tuple: (decoded value, uncompressed serialized size).
+    """
+    if not blob.startswith(MAGIC):
+        return json.loads(blob), len(blob)
+    serializer_id, compressor_id = blob[len(MAGIC)], blob[len(MAGIC) + 1]
+    payload = blob[len(MAGIC) + 2 :]
+    if compressor_id:
+        payload = DECOMPRESSORS[compressor_id](payload)
+    return DECODERS[serializer_id](payload), len(payload)
+
+
+def get_codec_stats() -> dict[str, Any]:
+    """
+    Report the active codec and how much it saved.
+    Returns:
+        dict: Serializer, compressor and byte counters.
+    """
+    return {
+        "serializer": serializer_name,
+        "compressor": compressor_name,
+        **codec_stats,
+    }
+
+# Keys with a background refresh in progress, and strong refs to those tasks
+refreshing: set[str] = set()
+refresh_tasks: set[asyncio.Task] = set()
+
+SWR_MARKER = "swr_soft_expiry"
+# Entries larger than this are decoded in a worker thread
+THREAD_DECODE_THRESHOLD = 256 * 1024
+
+
+# Cache namespaces, each invalidated in O(1) by bumping its generation counter
+NAMESPACES = (
+    "metadata",
+    "mapdata",
+    "screenshot",
+    "market",
+    "negative",
+    "freshness",
+    "availability",
+)
+GENERATION_REFRESH = 5  # seconds before re-reading a generation from Valkey
+
+generations: dict[str, tuple[int, float]] = {}
+# Plain dicts keyed by namespaced cache keys, kept in sync on invalidation
+local_stores: list[dict] = []
+cleanup_tasks: set[asyncio.Task] = set()
+
+
+async def get_generation(namespace: str) -> int:
+    """
+    Return the current generation of a cache namespace.
+    Args:
+        namespace: One of NAMESPACES.
+    Returns:
+        int: Generation counter, 0 if never bumped.
+    """
+    cached = generations.get(namespace)
+    now = time.monotonic()
+    if cached and (not valkey or now - cached[1] < GENERATION_REFRESH):
+        return cached[0]
+
+    generation = cached[0] if cached else 0
+    if valkey:
+        try:
+            raw = await valkey.get(f"{VALKEY_KEY_PREFIX}:gen:{namespace}")
+            generation = int(raw) if raw else 0
+        except Exception as e:
+            logger.error(f"Error reading generation for {namespace}: {e}")
+    generations[namespace] = (generation, now)
+    return generation
+
+
+async def cache_key(namespace: str, chain: str, token: str) -> str:
+    """
+    Build a namespaced, versioned cache key.
+    Args:
+        namespace: One of NAMESPACES.
+        chain: Blockchain network identifier (e.g., 'eth').
+        token: Token address.
+    Returns:
+        str: Cache key for the current generation of the namespace.
+    """
+    generation = await get_generation(namespace)
+    return f"{VALKEY_KEY_PREFIX}:{namespace}:v{generation}:{chain}:{token}"
+
+
+def _drop_local(predicate: Callable[[str], bool]) -> None:
+    if l1 is not None:
+        for key in [k for k in l1.entries if predicate(k)]:
+            l1.delete(key)
+    for store in local_stores:
+        for key in [k for k in store if predicate(k)]:
+            del store[key]
+
+
+async def cleanup_orphans(namespace: str, below_generation: int) -> int:
+    """
+    Delete keys left behind by older generations of a namespace using SCAN.
+    Args:
+        namespace: One of NAMESPACES.
+        below_generation: Keys from generations lower than this are removed.
+    Returns:
+        int: Number of keys removed.
+    """
+    if not valkey:
+        return 0
+    removed = 0
+    prefix = f"{VALKEY_KEY_PREFIX}:{namespace}:v"
+    batch = []
+    async for raw in valkey.scan_iter(match=f"{prefix}*", count=500):
+        key = raw.decode()
+        generation = key[len(prefix) :].split(":", 1)[0]
+        if generation.isdigit() and int(generation) < below_generation:
+            batch.append(raw)
+        if len(batch) >= 500:
+            removed += await valkey.unlink(*batch)
+            batch = []
+    if batch:
+        removed += await valkey.unlink(*batch)
+    logger.info(f"[CACHE CLEANUP] Removed {removed} orphaned {namespace} keys")
+    return removed
 
 
-async def get_cache(key: str) -> dict | None:
+def _schedule_cleanup(namespace: str, below_generation: int) -> None:
+    async def run():
+        try:
+            await cleanup_orphans(namespace, below_generation)
+        except Exception as e:
+            logger.error(f"Orphan cleanup failed for {namespace}: {e}")
+
+    task = asyncio.create_task(run())
+    cleanup_tasks.add(task)
+    task.add_done_callback(cleanup_tasks.discard)
+
+
+async def invalidate_namespace(namespace: str) -> int:
+    """
+    Invalidate every entry of a namespace by bumping its generation.
+    Old keys are removed by a background SCAN.
+    Args:
+        namespace: One of NAMESPACES.
+    Returns:
+        int: The new generation.
+    """
+    if valkey:
+        generation = await valkey.incr(f"{VALKEY_KEY_PREFIX}:gen:{namespace}")
+    else:
+        generation = (generations.get(namespace) or (0, 0))[0] + 1
+    generations[namespace] = (generation, time.monotonic())
+
+    stale_prefix = f"{VALKEY_KEY_PREFIX}:{namespace}:"
+    _drop_local(lambda key: key.startswith(stale_prefix))
+    if valkey:
+        _schedule_cleanup(namespace, generation)
+    logger.info(f"[CACHE] Invalidated namespace {namespace} (generation {generation})")
+    return generation
+
+
+async def invalidate_token(token: str) -> int:
+    """
+    Invalidate a token on every supported chain across all namespaces.
+    Args:
+        token: Token address.
+    Returns:
+        int: Number of Valkey keys removed.
+    """
+    keys = [
+        await cache_key(namespace, chain, token)
+        for namespace in NAMESPACES
+        for chain in SUPPORTED_CHAINS
+    ]
+    targets = set(keys)
+    _drop_local(lambda key: key in targets)
+    if not valkey:
+        return 0
+    return await valkey.unlink(*keys)
+
+
+async def _decode(raw: bytes) -> Any:
+    if len(raw) >= THREAD_DECODE_THRESHOLD:
+        value, _ = await asyncio.to_thread(decode_value, raw)
+    else:
+        value, _ = decode_value(raw)
+    return value
+
+
+async def _load(key: str, skip_l1: bool = False) -> Any:
+    # L1 keeps encoded frames: every reader decodes its own copy, so callers
+    # may modify what they get without altering the cached entry
+    try:
+        if l1 is not None and not skip_l1:
+            frame = l1.get(key)
+            if frame is not MISSING:
+                return await _decode(frame)
+        if not valkey:
+            return None
+        async with valkey.pipeline(transaction=False) as pipe:
+            raw, pttl = await pipe.get(key).pttl(key).execute()
+        if not raw:
+            return None
+        if l1 is not None and pttl and pttl > 0:
+            l1.set(key, raw, size=len(raw), ttl=pttl / 1000)
+        return await _decode(raw)
+    except Exception as e:
+        logger.error(f"Error fetching cache for key {key}: {e}")
+        return None
+
+
+def _unwrap(entry: Any) -> tuple[Any, float | None]:
+    if isinstance(entry, dict) and SWR_MARKER in entry:
+        return entry.get("value"), entry[SWR_MARKER]
+    return entry, None
+
+
+async def get_cache(key: str, skip_l1: bool = False) -> dict | None:
     """
-    Retrieve a cached value from Valkey by key.
+    Retrieve a cached value by key, from the in-process L1 cache or Valkey.
     Args:
         key: Cache key.
+        skip_l1: Read from Valkey even if the L1 cache holds the key, to see
+            values written by other processes; the L1 entry is refreshed.
     Returns:
         dict: Cached value if found, None otherwise.
     """
+    value, _ = _unwrap(await _load(key, skip_l1))
+    return value
+
+
+async def set_cache(
+    key: str, value: dict, ttl: int = None, stale_ttl: int = None
+) -> None:
+    """
+    Store a value in Valkey and the in-process L1 cache with an optional TTL.
+    Args:
+        key: Cache key.
+        value: Dictionary to cache.
+        ttl: Time-to-live in seconds (defaults to VALKEY_TTL if None).
+        stale_ttl: If set, keep serving the value for this many extra seconds
+            after ttl while it is refreshed in the background (see get_cache_swr).
+    """
+    if not valkey and l1 is None:
+        return
+    ttl = ttl or VALKEY_TTL
+    try:
+        if stale_ttl:
+            value = {SWR_MARKER: time.time() + ttl, "value": value}
+            ttl += stale_ttl
+        frame, _ = encode_value(value)
+        if l1 is not None:
+            l1.set(key, frame, size=len(frame), ttl=ttl)
+        if valkey:
+            await valkey.set(key, frame, ex=ttl)
+    except Exception as e:
+        logger.error(f"Error setting cache for key {key}: {e}")
+
+
+async def _background_refresh(
+    key: str, refresh: Callable[[], Awaitable[Any]]
+) -> None:
+    try:
+        await refresh()
+    except Exception as e:
+        logger.error(f"Background refresh failed for key {key}: {e}")
+    finally:
+        refreshing.discard(key)
+
+
+async def get_cache_swr(
+    key: str, refresh: Callable[[], Awaitable[Any]]
+) -> dict | None:
+    """
+    Retrieve a cached value, serving stale entries while they are refreshed.
+    Entries written with set_cache(..., stale_ttl=...) are returned as-is until
+    their soft expiry; afterwards the stale value is still returned immediately
+    and a single background refresh is started. Misses call refresh inline.
+    Args:
+        key: Cache key.
+        refresh: Coroutine factory that fetches the value and writes it with
+            set_cache(key, ..., stale_ttl=...).
+    Returns:
+        dict: Cached or freshly fetched value, None if unavailable.
+    """
+    value, soft_expiry = _unwrap(await _load(key))
+    if value is None:
+        return await refresh()
+
+    if soft_expiry is not None and time.time() >= soft_expiry:
+        if key not in refreshing:
+            logger.debug(f"[CACHE STALE] {key} - refreshing in background")
+            refreshing.add(key)
+            task = asyncio.create_task(_background_refresh(key, refresh))
+            refresh_tasks.add(task)
+            task.add_done_callback(refresh_tasks.discard)
+    return value
+
+
+async def get_blob(key: str) -> tuple[bytes, dict[str, str]] | None:
+    """
+    Retrieve a binary blob and its metadata, bypassing the codec and L1 cache.
+    Args:
+        key: Cache key.
+    Returns:
+        tuple: (raw bytes, metadata fields as strings) if found, None otherwise.
+    """
     if not valkey:
         return None
     try:
-        raw = await valkey.get(key)
-        return json.loads(raw) if raw else None
+        fields = await valkey.hgetall(key)
     except Exception as e:
-        logger.error(f"Error fetching cache for key {key}: {e}")
+        logger.error(f"Error fetching blob for key {key}: {e}")
+        return None
+    data = fields.pop(b"data", None)
+    if data is None:
         return None
+    return data, {k.decode(): v.decode() for k, v in fields.items()}
 
 
-async def set_cache(key: str, value: dict, ttl: int = None) -> None:
+async def set_blob(
+    key: str, data: bytes, meta: dict[str, Any], ttl: int = None
+) -> None:
     """
-    Store a value in Valkey with an optional TTL.
+    Store a binary blob with small metadata fields as a Valkey hash.
     Args:
         key: Cache key.
-        value: Dictionary to cache.
+        data: Raw bytes to store as-is.
+        meta: Metadata fields (stringified).
         ttl: Time-to-live in seconds (defaults to VALKEY_TTL if None).
     """
     if not valkey:
         return
     try:
-        await valkey.set(key, json.dumps(value), ex=ttl or VALKEY_TTL)
+        mapping = {k: str(v) for k, v in meta.items()}
+        mapping["data"] = data
+        async with valkey.pipeline(transaction=True) as pipe:
+            # DEL first: the key may still hold a legacy string entry
+            await (
+                pipe.delete(key)
+                .hset(key, mapping=mapping)
+                .expire(key, ttl or VALKEY_TTL)
+                .execute()
+            )
     except Exception as e:
-        logger.error(f"Error setting cache for key {key}: {e}")
+        logger.error(f"Error setting blob for key {key}: {e}")
 
 
 async def shutdown_valkey(_: Application) -> None:
@@ -0,0 +1,65 @@
+import asyncio
+
+from bubblemaps_bot import logger
+from bubblemaps_bot.db.wallets import get_indexed_version, replace_token_holdings
+
+# Strong refs to in-flight index updates
+index_tasks: set[asyncio.Task] = set()
+
+
+def build_holdings(map_data: dict, ranking: dict) -> list[dict]:
+    """
+    Flatten a map into reverse-index rows, one per holder.
+    Args:
+        map_data: Map data as returned by the Bubblemaps API.
+        ranking: Ranking as built by build_ranking.
+    Returns:
+        list: Dicts with lower-cased address, amount, percentage and rank.
+    """
+    nodes = map_data.get("nodes", [])
+    return [
+        {
+            "address": nodes[i]["address"].lower(),
+            "amount": nodes[i].get("amount", 0) or 0,
+            "percentage": nodes[i].get("percentage", 0) or 0,
+            "rank": rank,
+        }
+        for rank, i in enumerate(ranking["order"], start=1)
+    ]
+
+
+async def update_wallet_index(chain: str, token: str, entry: dict) -> None:
+    """
+    Re-index a token's holders if its map version changed since the last update.
+    Args:
+        chain: Blockchain network identifier (e.g., 'eth').
+        token: Token address.
+        entry: Map entry as returned by fetch_map_entry.
+    """
+    token = token.lower()
+    version = entry.get("dt_update")
+    if version is not None and await get_indexed_version(chain, token) == version:
+        return
+    holdings = build_holdings(entry["data"], entry["ranking"])
+    await replace_token_holdings(chain, token, version, holdings)
+    logger.info(f"[WALLET INDEX] Indexed {len(holdings)} holders of {chain}:{token}")
+
+
+def schedule_wallet_index(chain: str, token: str, entry: dict) -> None:
+    """
+    Update the reverse index in the background so map ingestion is not delayed.
+    Args:
+        chain: Blockchain network identifier (e.g., 'eth').
+        token: Token address.
+        entry: Map entry as returned by fetch_map_entry.
+    """
+
+    async def run():
+        try:
+            await update_wallet_index(chain, token, entry)
+        except Exception as e:
+            logger.error(f"Wallet index update failed for {chain}:{token}: {e}")
+
+    task = asyncio.create_task(run())
+    index_tasks.add(task)
+    task.add_done_callback(index_tasks.discard)
@@ -0,0 +1,24 @@
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import yaml
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# bubblemaps_bot reads config.yaml and logging.ini from the working directory
+# on import; give the tests their own, based on sample_config.yaml.
+_workdir = Path(tempfile.gettempdir()) / "bubblemaps_bot_tests"
+_workdir.mkdir(parents=True, exist_ok=True)
+
+_config = yaml.safe_load((ROOT / "sample_config.yaml").read_text())
+_config["telegram"].update(bot_token="123456:TEST", sudo_users=[])
+_config["database"]["schema"] = "sqlite+aiosqlite:///:memory:"
+_config["valkey"].update(enabled=False, ttl=600, screenshot_cache=False)
+(_workdir / "config.yaml").write_text(yaml.safe_dump(_config))
+shutil.copy(ROOT / "logging.ini", _workdir / "logging.ini")
+
+os.chdir(_workdir)
+sys.path.insert(0, str(ROOT))
@@ -0,0 +1,100 @@
+import asyncio
+import time
+
+import pytest
+
+from bubblemaps_bot import MAP_DATA_MAX_AGE, VALKEY_TTL
+from bubblemaps_bot.utils import bubblemaps_api, singleflight
+
+CHAIN = "eth"
+TOKEN = "0x19de6b897ed14a376dda0fe53a5420d2ac828a28"
+
+
+class HeldLock:
+    """Lock held by another bot process."""
+
+    async def acquire(self, blocking=True):
+        return False
+
+    async def release(self):
+        pass
+
+
+class RemoteValkey:
+    """Just enough of Valkey for single_flight's cross-process lock."""
+
+    def __init__(self):
+        self.locked = True
+
+    def lock(self, name, timeout=None):
+        return HeldLock()
+
+    async def exists(self, name):
+        return self.locked
+
+
+@pytest.fixture
+def store(monkeypatch):
+    entries = {}
+
+    async def get_cache(key, skip_l1=False):
+        return entries.get(key)
+
+    async def download_map_data(token, chain):
+        raise AssertionError("the losing process must not download the map")
+
+    monkeypatch.setattr(bubblemaps_api, "get_cache", get_cache)
+    monkeypatch.setattr(bubblemaps_api, "download_map_data", download_map_data)
+    monkeypatch.setattr(singleflight, "get_cache", get_cache)
+    monkeypatch.setattr(singleflight, "SINGLE_FLIGHT_LOCK", True)
+    monkeypatch.setattr(singleflight, "POLL_INTERVAL", 0.01)
+    return entries
+
+
+@pytest.mark.parametrize(
+    "age, refreshed_by_remote",
+    [
+        # Past VALKEY_TTL: the other process revalidates the entry
+        (VALKEY_TTL + 1, lambda stale, now: {**stale, "validated_at": now}),
+        # Past MAP_DATA_MAX_AGE: the other process downloads the map again
+        (
+            MAP_DATA_MAX_AGE + 1,
+            lambda stale, now: {**stale, "fetched_at": now, "validated_at": now},
+        ),
+    ],
+)
+def test_losing_process_gets_refreshed_entry(
+    monkeypatch, store, age, refreshed_by_remote
+):
+    remote = RemoteValkey()
+    monkeypatch.setattr(singleflight, "valkey", remote)
+
+    now = time.time()
+    stale = {
+        "dt_update": "2025-01-01T00:00:00",
+        "fetched_at": now - age,
+        "validated_at": now - age,
+        "data": {"nodes": [], "links": []},
+    }
+
+    async def scenario():
+        key = await bubblemaps_api.cache_key("mapdata", CHAIN, TOKEN)
+        store[key] = stale
+
+        async def other_process():
+            # Polls during this window only see the stale entry
+            await asyncio.sleep(0.1)
+            store[key] = refreshed_by_remote(stale, time.time())
+            await asyncio.sleep(0.05)
+            remote.locked = False
+
+        task = asyncio.create_task(other_process())
+        entry = await bubblemaps_api.fetch_map_entry(TOKEN, CHAIN)
+        await task
+        return entry
+
+    entry = asyncio.run(scenario())
+
+    assert entry is not stale
+    assert entry["validated_at"] > now
+    assert time.time() - entry["fetched_at"] < MAP_DATA_MAX_AGE